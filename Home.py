@@ -4,6 +4,7 @@ from pathlib import Path
 
 # Add the project root to the Python path
 sys.path.append(str(Path(__file__).parent))
+from utils.sessions import restore_session, end_session
 
 # Initialize session state for authentication
 if 'authenticated' not in st.session_state:
@@ -17,8 +18,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Check authentication
-if not st.session_state.authenticated:
+# Check authentication (a valid session token in the URL counts)
+if not restore_session():
     st.switch_page("pages/1_🔐User Auth.py")
 
 st.title(f"Welcome to Synchrony Project Management, {st.session_state.user['name']}!")
@@ -26,9 +27,8 @@ st.title(f"Welcome to Synchrony Project Management, {st.session_state.user['name
 # Add logout button in sidebar
 with st.sidebar:
     if st.button("Logout"):
-        st.session_state.authenticated = False
-        st.session_state.user = None
-        st.switch_page("pages/1_user_auth.py")
+        end_session()  # also revokes the session token
+        st.switch_page("pages/1_🔐User Auth.py")
 
 st.markdown("""
 ### 👈 Select a page from the sidebar to get started:
@@ -0,0 +1,271 @@
+# run.py
+# Timed scenarios over synthetic data, written to a JSON report.
+#
+#     python -m benchmarks.run --backends journal,sqlite --out bench.json
+#     python -m benchmarks.run --compare bench.json     # diff against an earlier run
+#
+# Each scenario runs in a scratch directory (the backends use relative
+# paths) and records per-operation latency; the report has throughput and
+# p50/p95/max for each, plus the workload and environment it ran on.
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from benchmarks import synthetic
+from utils import assistant, auth
+from utils.analytics import TaskSnapshot
+from utils.history import StatusHistory
+from utils.storage import add_task_op, make_backend, update_task_op, atomic_write_json
+from utils.store import ProjectStats, ProjectStore
+
+
+def summarize(latencies):
+    """Throughput and latency percentiles (ms) for a list of durations in seconds"""
+    ordered = sorted(latencies)
+    n = len(ordered)
+    total = sum(ordered)
+
+    def pct(p):
+        return ordered[min(n - 1, int(round(p * (n - 1))))] * 1000 if n else None
+
+    return {
+        "n": n,
+        "total_s": round(total, 6),
+        "ops_per_s": round(n / total, 2) if total else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "max_ms": ordered[-1] * 1000 if n else None,
+    }
+
+
+def timed(fn, repeat):
+    latencies = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+@contextmanager
+def scratch_dir():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="synchrony-bench-") as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(cwd)
+
+
+def seeded_store(backend_name, document):
+    backend = make_backend(backend_name)
+    backend.save(document)
+    return ProjectStore(backend, StatusHistory())
+
+
+def _counts(stats):
+    # Comparable form of a ProjectStats, ignoring keys whose count dropped to zero
+    return (+stats.status_counts, +stats.open_deadlines,
+            {user: tuple(c) for user, c in stats.members.items() if any(c)})
+
+
+def check_stats(store):
+    """Raise if the maintained per-project counters disagree with a recount"""
+    for project in store.data()["projects"]:
+        if _counts(store.stats(project.id)) != _counts(ProjectStats.of(project)):
+            raise AssertionError(f"stats for project {project.id} drifted from a recount")
+
+
+def self_check(backend_name):
+    """Status changes must move a task between counters, not add it again"""
+    with scratch_dir():
+        task = synthetic.make_task(random.Random(0), "Bob")
+        store = seeded_store(backend_name, {"projects": [{
+            "id": "p", "title": "P", "description": "", "team_lead": "Bob", "members": ["Bob"], "tasks": [task],
+        }]})
+        for status in ("In Progress", "Complete", "To Do", "Complete"):
+            store.apply([update_task_op("p", task["id"], {"status": status})])
+        stats = store.stats("p")
+        if stats.total != 1 or stats.member("Bob") != (1, 1):
+            raise AssertionError(f"expected 1 task for Bob, stats say {stats.total} ({stats.member('Bob')})")
+        check_stats(store)
+
+
+# ---- Scenarios: each returns {name: [latency, ...]} ----
+def storage_scenarios(backend_name, workload, ops):
+    document = synthetic.projects(workload)
+    rng = random.Random(f"{workload.seed}-ops")  # not the generator's stream: new ids must not collide
+    team = synthetic.member_names(workload)
+    results = {}
+    with scratch_dir():
+        store = seeded_store(backend_name, document)
+        # Cold load in a fresh store each time, as after a server restart
+        results["load_data"] = timed(lambda i: ProjectStore(make_backend(backend_name)).data(), max(3, ops // 20))
+        data = store.data()
+        results["save_data"] = timed(lambda i: store.save(data), max(3, ops // 20))
+
+        project_ids = [p["id"] for p in document["projects"]]
+        results["add_task"] = timed(
+            lambda i: store.apply([add_task_op(rng.choice(project_ids), synthetic.make_task(rng, rng.choice(team)))]),
+            ops,
+        )
+        tasks = [(p.id, t.id) for p in store.data()["projects"] for t in p.tasks]
+        statuses = ["To Do", "In Progress", "Complete"]
+        results["update_task_status"] = timed(
+            lambda i: store.apply([update_task_op(*rng.choice(tasks), {"status": statuses[i % 3]})]),
+            ops,
+        )
+        check_stats(store)
+        results["query_user_tasks"] = timed(
+            lambda i: store.query(assignee=rng.choice(team), sort=("priority", "deadline"), limit=50),
+            ops,
+        )
+        results["my_work"] = timed(lambda i: store.work_for(rng.choice(team)), ops)
+    return results
+
+
+def dashboard_scenarios(workload, ops):
+    document = synthetic.projects(workload)
+    with scratch_dir():
+        store = seeded_store("json", document)
+        data = store.data()
+        projects = data["projects"]
+        rng = random.Random(workload.seed)
+        return {
+            # Maintained counters (what the dashboard reads) vs. a full recount
+            "dashboard_stats": timed(lambda i: store.stats(rng.choice(projects).id).progress, ops),
+            "dashboard_recount": timed(lambda i: ProjectStats.of(rng.choice(projects)).progress, ops),
+            "analytics_snapshot": timed(lambda i: TaskSnapshot.from_data(data), max(3, ops // 20)),
+            "analytics_rollups": timed(
+                lambda i, snap=TaskSnapshot.from_data(data): (snap.completion_by("assignee"), snap.overdue_by("project")),
+                ops,
+            ),
+        }
+
+
+def login_scenarios(workload, ops):
+    users = synthetic.users(workload)
+    rng = random.Random(workload.seed)
+    with scratch_dir() as path:
+        saved = auth.USER_DATA_FILE
+        auth.USER_DATA_FILE = os.path.join(path, "users.json")
+        try:
+            atomic_write_json(auth.USER_DATA_FILE, {"users": users})
+
+            def login(i):
+                n = rng.randrange(len(users))
+                auth.login_user(users[n]["email"], synthetic.user_password(n))
+
+            results = {
+                "login_user": timed(login, ops),  # repeats hit the verification cache
+                "login_user_miss": timed(lambda i: auth.login_user("nobody@example.com", "wrong"), ops),
+                "register_user": timed(
+                    lambda i: auth.register_user(f"new{i}", f"new{i}@example.com", "pw"), max(3, ops // 20)
+                ),
+            }
+        finally:
+            auth.USER_DATA_FILE = saved
+    return results
+
+
+def chatbot_scenarios(workload, ops):
+    messages = ["hi", "what are my tasks?", "any deadlines?", "what should i start next",
+                "help me prioritize", "I'm overwhelmed", "tell me something"]
+    with scratch_dir():
+        saved = assistant.TODO_FILE, assistant.CHAT_HISTORY_FILE
+        assistant.TODO_FILE, assistant.CHAT_HISTORY_FILE = "todo_data.json", "chat_history.json"
+        try:
+            atomic_write_json(assistant.TODO_FILE, synthetic.todo_data(workload))
+            bot = assistant.TodoChatbot()
+            return {"get_smart_response": timed(lambda i: bot.get_smart_response(messages[i % len(messages)]), ops)}
+        finally:
+            assistant.TODO_FILE, assistant.CHAT_HISTORY_FILE = saved
+
+
+# ---- Report ----
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(workload, backends, ops):
+    scenarios = {}
+    for name in backends:
+        self_check(name)
+        for scenario, latencies in storage_scenarios(name, workload, ops).items():
+            scenarios[f"{scenario}[{name}]"] = summarize(latencies)
+    for group in (dashboard_scenarios, login_scenarios, chatbot_scenarios):
+        for scenario, latencies in group(workload, ops).items():
+            scenarios[scenario] = summarize(latencies)
+    return {
+        "meta": {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workload": workload.to_dict(),
+            "ops": ops,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(report, baseline):
+    """One line per scenario with its p50 change versus an earlier report"""
+    lines = []
+    for name, now in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before.get("p50_ms") or not now.get("p50_ms"):
+            continue
+        change = (now["p50_ms"] / before["p50_ms"] - 1) * 100
+        lines.append(f"{name:40} p50 {before['p50_ms']:9.3f} -> {now['p50_ms']:9.3f} ms ({change:+.0f}%)")
+    return lines
+
+
+def main(argv=None):
+    defaults = synthetic.Workload()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Synchrony benchmarks")
+    parser.add_argument("--projects", type=int, default=defaults.projects)
+    parser.add_argument("--tasks", type=int, default=defaults.tasks_per_project, help="tasks per project")
+    parser.add_argument("--members", type=int, default=defaults.members, help="members per project")
+    parser.add_argument("--depth", type=int, default=defaults.subtask_depth, help="max subtask depth")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--ops", type=int, default=200, help="operations per scenario")
+    parser.add_argument("--backends", default="journal,json,sqlite,sharded")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    workload = synthetic.Workload(args.projects, args.tasks, args.members, args.depth, args.users,
+                                  seed=args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report = run(workload, [b for b in args.backends.split(",") if b], args.ops)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if baseline is not None:
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
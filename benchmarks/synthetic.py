@@ -0,0 +1,125 @@
+# synthetic.py
+# Deterministic synthetic workloads for the benchmarks.
+import random
+import uuid
+from datetime import date, datetime, timedelta
+
+from utils.auth import hash_password
+from utils.models import Priority, Status
+
+CATEGORIES = ["Design", "Dev", "QA", "Research", "Ops", "Docs"]
+
+
+class Workload:
+    """Knobs for the generators below; the defaults make a mid-sized team"""
+
+    __slots__ = ("projects", "tasks_per_project", "members", "subtask_depth", "users", "todo_tasks", "seed")
+
+    def __init__(self, projects=20, tasks_per_project=250, members=8, subtask_depth=2,
+                 users=1000, todo_tasks=200, seed=42):
+        self.projects = projects
+        self.tasks_per_project = tasks_per_project
+        self.members = members
+        self.subtask_depth = subtask_depth
+        self.users = users
+        self.todo_tasks = todo_tasks
+        self.seed = seed
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def member_names(workload):
+    return [f"member{i}" for i in range(workload.members * 3)]
+
+
+def make_task(rng, assignee, parent_id=None, today=None):
+    today = today or date.today()
+    return {
+        "id": _uuid(rng),
+        "title": f"Task {rng.randrange(10**6)}",
+        "assignee": assignee,
+        "status": rng.choice(list(Status)).value,
+        "deadline": (today + timedelta(days=rng.randint(-30, 60))).isoformat(),
+        "priority": rng.choice(list(Priority)).value,
+        "category": rng.choice(CATEGORIES),
+        "parent_id": parent_id,
+        "created": str(datetime.now() - timedelta(minutes=rng.randrange(60 * 24 * 90))),
+    }
+
+
+def projects(workload):
+    """{"projects": [...]} document.
+
+    Each project draws its team from a shared pool of names, so people work
+    on several projects. Tasks nest up to `subtask_depth` levels: a task
+    becomes a subtask of a random earlier task whose depth allows it.
+    """
+    rng = random.Random(workload.seed)
+    pool = member_names(workload)
+    result = []
+    for p in range(workload.projects):
+        team = rng.sample(pool, min(workload.members, len(pool)))
+        tasks, depth = [], {}
+        for _ in range(workload.tasks_per_project):
+            parent = None
+            if tasks and workload.subtask_depth and rng.random() < 0.3:
+                candidate = rng.choice(tasks)
+                if depth[candidate["id"]] < workload.subtask_depth:
+                    parent = candidate
+            task = make_task(rng, rng.choice(team), parent and parent["id"])
+            depth[task["id"]] = depth[parent["id"]] + 1 if parent else 0
+            tasks.append(task)
+        result.append({
+            "id": _uuid(rng),
+            "title": f"Project {p}",
+            "description": "Synthetic benchmark project",
+            "team_lead": team[0],
+            "members": team,
+            "tasks": tasks,
+        })
+    return {"projects": result}
+
+
+def user_password(i):
+    return f"pw-{i}"
+
+
+def users(workload, hash_iterations=1000):
+    """users.json records with salted hashes.
+
+    Hashes use few iterations so generating thousands stays quick; the
+    iteration count is stored in each hash, so logins verify with the same.
+    """
+    return [
+        {"name": f"user{i}", "email": f"user{i}@example.com",
+         "password_hash": hash_password(user_password(i), iterations=hash_iterations)}
+        for i in range(workload.users)
+    ]
+
+
+def todo_data(workload):
+    """The assistant's to-do document"""
+    rng = random.Random(workload.seed + 1)
+    today = date.today()
+    return {
+        "tasks": [
+            {
+                "id": i,
+                "title": f"Todo {i}",
+                "description": "",
+                "priority": rng.choice(["high", "medium", "low"]),
+                "status": rng.choice(["pending", "in_progress", "completed"]),
+                "due_date": (today + timedelta(days=rng.randint(-10, 30))).isoformat(),
+                "category": rng.choice(CATEGORIES).lower(),
+                "estimated_hours": rng.randint(1, 16),
+            }
+            for i in range(workload.todo_tasks)
+        ],
+        "categories": [c.lower() for c in CATEGORIES],
+        "last_updated": datetime.now().isoformat(),
+    }
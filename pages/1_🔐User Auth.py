@@ -1,7 +1,9 @@
 import streamlit as st
-import json
-import os
+import sys
 from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.auth import init_user_file, register_user, login_user
+from utils.sessions import restore_session, start_session
 
 # Initialize session state for authentication
 if 'authenticated' not in st.session_state:
@@ -9,48 +11,13 @@ if 'authenticated' not in st.session_state:
 if 'user' not in st.session_state:
     st.session_state.user = None
 
-USER_DATA_FILE = str(Path(__file__).parent.parent / "users.json")
-
-def init_user_file():
-    if not os.path.exists(USER_DATA_FILE):
-        with open(USER_DATA_FILE, "w") as f:
-            json.dump({"users": []}, f)
-
-def load_users():
-    with open(USER_DATA_FILE, "r") as f:
-        return json.load(f)["users"]
-
-def save_users(users):
-    with open(USER_DATA_FILE, "w") as f:
-        json.dump({"users": users}, f, indent=2)
-
-def register_user(name, email, password):
-    users = load_users()
-    if any(user["email"] == email for user in users):
-        return False, "Email already exists."
-    new_user = {
-        "name": name,
-        "email": email,
-        "password": password
-    }
-    users.append(new_user)
-    save_users(users)
-    return True, "Registration successful!"
-
-def login_user(email, password):
-    users = load_users()
-    for user in users:
-        if user["email"] == email and user["password"] == password:
-            return True, user
-    return False, None
-
 # Initialize the users.json file if it doesn't exist
 init_user_file()
 
 st.set_page_config(page_title="Login / Register", layout="wide")
 
-# If already authenticated, redirect to home
-if st.session_state.authenticated:
+# If already authenticated (or returning with a valid session token), redirect to home
+if restore_session():
     st.switch_page("Home.py")
 
 # Create two columns for login and registration
@@ -64,10 +31,10 @@ with col1:
         login_submitted = st.form_submit_button("Login")
         
         if login_submitted:
-            success, user = login_user(login_email, login_password)
+            with st.spinner("Checking credentials..."):  # hashed on a worker thread
+                success, user = login_user(login_email, login_password)
             if success:
-                st.session_state.authenticated = True
-                st.session_state.user = user
+                start_session(user)  # token in the URL restores this login on reload
                 st.success("Login successful!")
                 st.switch_page("Home.py")
             else:
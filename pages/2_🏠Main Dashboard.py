@@ -1,18 +1,21 @@
 # main_dashboard.py (Streamlit Project Dashboard)
 import streamlit as st
-from utils.backend_manager import load_data
-from collections import Counter
+from utils.backend_manager import (
+    list_projects, get_project, get_project_stats, get_overdue_tasks, get_tasks_due_within,
+    get_analytics, get_burndown, get_cycle_times,
+)
+import pandas as pd
+from utils.sessions import restore_session
 
-if not st.session_state.get("authenticated"):
+if not restore_session():  # logged in here, or a valid token in the URL
     st.error("🔒 Please log in from the User Auth page first.")
     st.stop()
 
 st.set_page_config(page_title="Main Dashboard", layout="wide")
 st.title("📊 Main Project Dashboard")
 
-# Load data
-data = load_data()
-project_titles = {p['title']: p['id'] for p in data['projects']}
+# Load project list (ids/titles only; the selected project is loaded below)
+project_titles = {p['title']: p['id'] for p in list_projects()}
 
 if not project_titles:
     st.warning("⚠️ No projects available yet. Please ask the Team Lead to create one in the Project Board.")
@@ -25,39 +28,75 @@ else:
         st.error("Something went wrong. Please refresh.")
         st.stop()
 
-    project = next(p for p in data['projects'] if p['id'] == selected_project_id)
+    project = get_project(selected_project_id)
 
 
 # Project Info
 st.header("📁 Project Information")
-st.markdown(f"**Title:** {project['title']}")
-st.markdown(f"**Description:** {project['description']}")
+st.markdown(f"**Title:** {project.title}")
+st.markdown(f"**Description:** {project.description}")
 
 # Team Overview
 st.header("👥 Team Overview")
-st.markdown(f"**Team Lead:** {project['team_lead']}")
+st.markdown(f"**Team Lead:** {project.team_lead}")
 st.markdown("**Team Members:**")
-st.markdown(", ".join(project['members']))
+st.markdown(", ".join(project.members))
 
-# Progress Calculation
-status_counts = Counter(task['status'] for task in project['tasks'])
-total_tasks = sum(status_counts.values())
-completed_tasks = status_counts.get("Complete", 0)
-overall_progress = (completed_tasks / total_tasks) * 100 if total_tasks > 0 else 0
+# Progress Calculation (counters are maintained by the store on every write)
+stats = get_project_stats(selected_project_id)
+overall_progress = stats.progress * 100
 
 st.header("📈 Overall Progress")
 st.progress(overall_progress / 100)
-st.metric("Project Completion", f"{overall_progress:.2f}%")
+col1, col2 = st.columns(2)
+col1.metric("Project Completion", f"{overall_progress:.2f}%")
+col2.metric("Overdue Tasks", stats.overdue())
+
+burndown = get_burndown(selected_project_id)
+if burndown:
+    st.caption("Open tasks per day")
+    st.line_chart(pd.DataFrame(burndown, columns=["day", "open"]).set_index("day"))
 
 # Individual Progress
 st.header("📌 Individual Progress")
-for member in project['members']:
-    member_tasks = [t for t in project['tasks'] if t['assignee'] == member]
-    if member_tasks:
-        done = len([t for t in member_tasks if t['status'] == "Complete"])
-        perc = (done / len(member_tasks)) * 100
+for member in project.members:
+    done, total = stats.member(member)
+    if total:
+        perc = (done / total) * 100
         st.write(f"**{member}**")
         st.progress(perc / 100)
-        st.caption(f"{done}/{len(member_tasks)} tasks complete")
+        st.caption(f"{done}/{total} tasks complete")
     else:
         st.write(f"**{member}** - No tasks assigned yet")
+
+cycle_times = get_cycle_times()
+members = {m.strip().lower(): m for m in project.members}
+rows = {members[u]: t for u, t in cycle_times.items() if u in members}
+if rows:
+    st.caption("Average days from creation (lead) and from first In Progress (cycle) to Complete")
+    st.dataframe(pd.DataFrame.from_dict(rows, orient="index"))
+
+# Deadlines across all projects (sorted deadline index, unfinished tasks only)
+st.header("⏰ Deadlines")
+overdue = get_overdue_tasks()
+due_soon = get_tasks_due_within(7)
+titles = {p['id']: p['title'] for p in list_projects()}
+with st.expander(f"Overdue ({len(overdue)}) • Due in the next 7 days ({len(due_soon)})"):
+    for label, rows in (("🔴 Overdue", overdue), ("🟠 Due soon", due_soon)):
+        if rows:
+            st.markdown(f"**{label}**")
+        for project_id, task in rows[:20]:
+            st.write(f"{task.deadline} • **{task.title}** ({task.assignee}) – {titles.get(project_id, project_id)}")
+
+# Organization-wide rollups from the columnar snapshot (cached per data version)
+st.header("🏢 All Projects")
+analytics = get_analytics()
+c1, c2, c3 = st.columns(3)
+c1.metric("Tasks", analytics.size)
+c2.metric("Completion", f"{analytics.completion() * 100:.1f}%")
+c3.metric("Overdue (of open with deadline)", f"{analytics.overdue_ratio() * 100:.1f}%")
+group = st.radio("Completion by", ["project", "assignee", "category", "priority"], horizontal=True)
+by_group = analytics.completion_by(group)
+st.dataframe(by_group[by_group["total"] > 0].join(analytics.overdue_by(group)[["overdue"]]))
+st.caption("Tasks created per week, and how many of those are complete")
+st.bar_chart(analytics.throughput("W"))
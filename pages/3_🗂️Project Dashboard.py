@@ -3,10 +3,15 @@ import streamlit as st
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from utils.backend_manager import load_data, create_project, add_task, update_task_status
+from utils.backend_manager import (
+    list_projects, get_project, get_project_stats, query_tasks, create_project, add_task, update_task_status,
+    get_subtasks, get_task_rollup,
+    ConflictError, STATUSES, Priority,
+)
+from utils.sessions import restore_session
 from datetime import datetime
 
-if not st.session_state.get("authenticated"):
+if not restore_session():  # logged in here, or a valid token in the URL
     st.error("🔒 Please log in from the User Auth page first.")
     st.stop()
 
@@ -32,8 +37,7 @@ with st.expander("➕ Create New Project"):
                 st.rerun()
 
 # ---- Load Projects ----
-data = load_data()
-project_titles = {p['title']: p['id'] for p in data['projects']}
+project_titles = {p['title']: p['id'] for p in list_projects()}
 
 if not project_titles:
     st.warning("⚠️ No projects available. Please create a project above.")
@@ -41,49 +45,98 @@ if not project_titles:
 
 selected_project_title = st.selectbox("Select Project", list(project_titles.keys()))
 selected_project_id = project_titles[selected_project_title]
-selected_project = next(p for p in data['projects'] if p['id'] == selected_project_id)
+selected_project = get_project(selected_project_id)
 
 # ---- Task Creation Section ----
-st.subheader(f"📌 Tasks for Project: {selected_project['title']}")
+st.subheader(f"📌 Tasks for Project: {selected_project.title}")
 
 with st.expander("➕ Add Task"):
     task_title = st.text_input("Task Title")
-    assignee = st.selectbox("Assignee", selected_project['members'])
-    status = st.selectbox("Status", ["To Do", "In Progress", "Complete"])
+    assignee = st.selectbox("Assignee", selected_project.members)
+    status = st.selectbox("Status", STATUSES)
     deadline = st.date_input("Deadline")
-    priority = st.selectbox("Priority", ["Low", "Medium", "High"])
+    priority = st.selectbox("Priority", list(reversed(Priority)))
     category = st.text_input("Category (e.g., Design, Dev)")
-    parent_options = ["None"] + [t['title'] for t in selected_project['tasks'] if not t.get('parent_id')]
-    parent_id = st.selectbox("Is Subtask Of", parent_options)
+    parent_titles = {t.id: t.title for t in selected_project.tasks}  # subtasks can nest
+    parent_id = st.selectbox(
+        "Is Subtask Of", [None] + list(parent_titles),
+        format_func=lambda tid: "None" if tid is None else parent_titles[tid]
+    )
     
     if st.button("Add Task"):
-        parent_task = None if parent_id == "None" else next(t for t in selected_project['tasks'] if t['title'] == parent_id)
-        add_task(selected_project_id, task_title, assignee, status, str(deadline), priority, category, parent_task['id'] if parent_task else None)
+        add_task(selected_project_id, task_title, assignee, status, str(deadline), priority, category, parent_id)
         st.success("✅ Task added successfully!")
         st.rerun()
 
 # ---- Kanban Board ----
-statuses = ["To Do", "In Progress", "Complete"]
+# Each column is a fragment, so paging through it reruns only that column.
+# A status change moves a card between columns and reruns the whole board.
+# Columns render one page of cards at a time.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
+
+def rerun_fragment():
+    try:
+        st.rerun(scope="fragment")
+    except TypeError:  # Streamlit without fragment-scoped reruns
+        st.rerun()
+
+statuses = STATUSES
 st.markdown("### 🧾 Kanban Board")
-cols = st.columns(3)
 
+with st.expander("🔎 Filters", expanded=False):
+    f1, f2, f3, f4 = st.columns(4)
+    filter_assignees = f1.multiselect("Assignee", selected_project.members)
+    filter_priorities = f2.multiselect("Priority", list(Priority))
+    filter_text = f3.text_input("Title contains").strip().lower()
+    page_size = f4.number_input("Cards per column", min_value=5, max_value=200, value=20, step=5)
+
+@fragment
+def kanban_column(project_id, status):
+    limit_key = f"kanban_limit_{project_id}_{status}"
+    limit = st.session_state.get(limit_key, page_size)
+
+    head, refresh = st.columns([4, 1])
+    total = get_project_stats(project_id).status_counts[status]
+    head.markdown(f"#### {status} ({total})")
+    if refresh.button("🔄", key=f"refresh_{project_id}_{status}", help="Refresh column"):
+        rerun_fragment()
+
+    # One extra row tells us whether to offer "Load more"
+    rows = query_tasks(
+        project=project_id, status=status,
+        assignee=filter_assignees or None, priority=filter_priorities or None,
+        text=filter_text or None, limit=limit + 1,
+    )
+    has_more = len(rows) > limit
+    for _, task in rows[:limit]:
+        indent = "↳ " if task.parent_id else ""
+        subtasks = ""
+        if get_subtasks(task.id, project_id):
+            rollup = get_task_rollup(task.id, project_id)  # cached until a descendant changes
+            subtasks = f"\n- Subtasks: {rollup.done}/{rollup.total} complete ({rollup.progress:.0%})"
+        st.markdown(f"""
+**{indent}{task.title}**
+- Assignee: {task.assignee}
+- Priority: {task.priority}
+- Deadline: {task.deadline or ''}
+- Category: {task.category}{subtasks}
+""")
+        new_status = st.selectbox(
+            "Change Status", statuses, index=statuses.index(status), key=task.id
+        )
+        if new_status != task.status:
+            try:
+                update_task_status(project_id, task.id, new_status, expected_version=task.version)
+                st.toast(f"✅ '{task.title}' moved to {new_status}")
+            except ConflictError:
+                st.toast(f"⚠️ '{task.title}' was changed by someone else. Board refreshed.")
+            st.rerun()  # both the source and the destination column changed
+
+    if has_more and st.button("Load more", key=f"more_{project_id}_{status}"):
+        st.session_state[limit_key] = limit + page_size
+        rerun_fragment()
+
+cols = st.columns(3)
 for i, status in enumerate(statuses):
     with cols[i]:
-        st.markdown(f"#### {status}")
-        for task in selected_project['tasks']:
-            if task['status'] == status:
-                indent = "↳ " if task.get('parent_id') else ""
-                st.markdown(f"""
-**{indent}{task['title']}**
-- Assignee: {task['assignee']}
-- Priority: {task['priority']}
-- Deadline: {task['deadline']}
-- Category: {task['category']}
-""")
-                new_status = st.selectbox(
-                    "Change Status", statuses, index=statuses.index(status), key=task['id']
-                )
-                if new_status != task['status']:
-                    update_task_status(selected_project_id, task['id'], new_status)
-                    st.success(f"✅ Task '{task['title']}' updated!")
-                    st.experimental_rerun()
+        kanban_column(selected_project_id, status)
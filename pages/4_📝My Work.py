@@ -1,8 +1,8 @@
 # my_work.py  ────────────────────────────────────────────────────────
 """
 🧑‍💻  My Work  –  per-user checklist
-• Reads every project in projects.json
-• Filters tasks where task["assignee"] == logged-in user
+• Reads the logged-in user's tasks from the shared assignee index
+  (task["assignee"] == logged-in user, case-insensitive)
 • Shows parent tasks and nested subtasks (parent_id links)
 • Lets you mark status  ⇆  'In Progress' ↔ 'Complete'
 """
@@ -10,16 +10,20 @@
 from __future__ import annotations
 import streamlit as st
 from datetime import date
-from collections import defaultdict
 
 # project helpers
 from utils.backend_manager import (
-    load_data,                              # returns {"projects":[…]}
-    update_task_status                      # (project_id, task_id, status)
+    get_user_work,                          # per-user index → UserWork
+    get_subtasks, get_task_rollup,          # subtree roll-up (cached)
+    update_task_status,                     # (project_id, task_id, status, expected_version)
+    ConflictError,                          # someone else changed the task first
+    apply_updates,                          # [(project_id, task_id, fields)] → one write
+    Status,
 )
+from utils.sessions import restore_session
 
 # ─────────────────────────────  get logged-in username
-if not st.session_state.get("authenticated"):
+if not restore_session():  # logged in here, or a valid token in the URL
     st.error("🔒 Please log in from the *User Auth* page first.")
     st.stop()
 
@@ -35,95 +39,92 @@ username = str(st.session_state.user.get("name", "guest")).strip().lower()
 
 # st.title(f"🧑‍💻 Tasks for **{username}**")
 
-# ─────────────────────────────  pull & bucket tasks
-data = load_data()
-user_tasks      = []                     # all tasks assigned to me
-subtask_lookup  = defaultdict(list)      # parent_id → list[subtask]
+# ─────────────────────────────  pull my tasks
+# shared cache – read only; ordered High → Low, then by deadline, with
+# subtasks already grouped by parent
+work         = get_user_work(username)
+user_tasks   = [t for _, t in work.tasks]                # all tasks assigned to me
+task_project = {t.id: pid for pid, t in work.tasks}      # task id → origin project id
+parent_tasks = [t for _, t in work.roots]                # parents / standalone
 
-for project in data["projects"]:
-    for t in project["tasks"]:
-        if t["assignee"].strip().lower() == username:
-            t["_project_id"] = project["id"]     # remember origin project
-            user_tasks.append(t)
-
-            # bucket subtasks by parent
-            if t.get("parent_id"):
-                subtask_lookup[t["parent_id"]].append(t)
-
-# split parents / standalone vs real subtasks
-parent_tasks = [t for t in user_tasks if not t.get("parent_id")]
-
-if not parent_tasks and not subtask_lookup:
+if not parent_tasks and not work.subtasks:
     st.info("🎉 Nothing assigned to you yet.")
     st.stop()
 
 # ─────────────────────────────  progress helper
 def completion_ratio() -> float:
     total = len(user_tasks)
-    done  = sum(1 for t in user_tasks if t["status"] == "Complete")
+    done  = sum(1 for t in user_tasks if t.status == Status.COMPLETE)
     return done / total if total else 0.0
 
 st.progress(completion_ratio(), text="Overall completion")
 
+# ─────────────────────────────  bulk action (single write)
+in_progress = [t for t in user_tasks if t.status == Status.IN_PROGRESS]
+if in_progress and st.button(f"✅ Complete all In Progress ({len(in_progress)})"):
+    apply_updates([(task_project[t.id], t.id, {"status": Status.COMPLETE}) for t in in_progress])
+    st.rerun()
+
 st.divider()
 
 # ─────────────────────────────  render checklist
 STATUS_CYCLE = {                     # click-to-toggle order
-    "To Do": "In Progress",
-    "In Progress": "Complete",
-    "Complete": "In Progress",       # allow undo
+    Status.TODO: Status.IN_PROGRESS,
+    Status.IN_PROGRESS: Status.COMPLETE,
+    Status.COMPLETE: Status.IN_PROGRESS,   # allow undo
 }
 
-def toggle_status(proj_id: str, task_id: str, cur_status: str):
-    new_status = STATUS_CYCLE.get(cur_status, "In Progress")
-    update_task_status(proj_id, task_id, new_status)
+def toggle_status(proj_id: str, task_id: str, cur_status: str, version: int = 0):
+    new_status = STATUS_CYCLE.get(cur_status, Status.IN_PROGRESS)
+    try:
+        update_task_status(proj_id, task_id, new_status, expected_version=version)
+    except ConflictError:
+        st.toast("⚠ This task was just changed by someone else – showing the latest status.")
     st.rerun() if hasattr(st, "experimental_rerun") else st.rerun()
 
-for task in sorted(
-        parent_tasks,
-        key=lambda t: (
-            {"High": 0, "Med": 1, "Low": 2}.get(t["priority"], 3),
-            t["deadline"],
-        )):
-    proj_id = task["_project_id"]
-    tid     = task["id"]
-    subtasks = subtask_lookup.get(tid, [])
+for task in parent_tasks:
+    proj_id = task_project[task.id]
+    tid     = task.id
+    subtasks = [t for _, t in work.subtasks.get(tid, [])]
 
     header = (
-        f"{'✅ ' if task['status']=='Complete' else ''}"
-        f"{task['title']} • 🗓 {task['deadline']} • {task['priority']}"
+        f"{'✅ ' if task.status == Status.COMPLETE else ''}"
+        f"{task.title} • 🗓 {task.deadline or ''} • {task.priority}"
     )
     with st.expander(header, expanded=False):
         # Top-level status toggle
         st.markdown("**Status**")
         st.button(
-            task["status"],
+            str(task.status),
             key=f"toggle_{tid}",
             help="Click to advance status",
             on_click=toggle_status,
-            args=(proj_id, tid, task["status"]),
+            args=(proj_id, tid, task.status, task.version),
         )
 
         # Description
-        if task["category"] or task["status"] != "To Do":
-            st.caption(f"Category • {task['category']}")
-        if task["deadline"]:
-            overdue = date.fromisoformat(task["deadline"]) < date.today()
-            if overdue and task["status"] != "Complete":
+        if task.category or task.status != Status.TODO:
+            st.caption(f"Category • {task.category}")
+        if task.deadline:
+            overdue = task.deadline < date.today()
+            if overdue and task.status != Status.COMPLETE:
                 st.error("⚠ Past Deadline")
-        if task["title"]:
+        if task.title:
             st.write(task.get("desc", "_No description_"))
 
         # --------  subtasks
+        if get_subtasks(tid, proj_id):
+            rollup = get_task_rollup(tid, proj_id)
+            st.progress(rollup.progress, text=f"Sub-tasks {rollup.done}/{rollup.total} complete")
         if subtasks:
             st.markdown("---")
             st.markdown("**Sub-tasks**")
             for sub in subtasks:
                 st.button(
-                    f"{'✅ ' if sub['status']=='Complete' else ''}{sub['title']}",
-                    key=f"sub_{sub['id']}",
+                    f"{'✅ ' if sub.status == Status.COMPLETE else ''}{sub.title}",
+                    key=f"sub_{sub.id}",
                     on_click=toggle_status,
-                    args=(proj_id, sub["id"], sub["status"]),
+                    args=(proj_id, sub.id, sub.status, sub.version),
                     help="Toggle completion",
                 )
 
@@ -0,0 +1,123 @@
+# analytics.py
+# Columnar snapshot of every task for org-wide rollups.
+#
+# TaskSnapshot copies the task fields the dashboards aggregate over into
+# NumPy arrays (small-int codes for status/priority/assignee/category/
+# project, datetime64 for deadlines and creation times) in one pass, then
+# answers group-by questions with bincount and boolean masks instead of
+# per-task Python loops. Build it through backend_manager.get_analytics(),
+# which caches one snapshot per data version.
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.models import Priority, Status
+from utils.store import normalize_user
+
+STATUS_CODES = {Status.TODO: 0, Status.IN_PROGRESS: 1, Status.COMPLETE: 2}
+STATUS_LABELS = [s.value for s in STATUS_CODES] + ["Other"]
+PRIORITY_LABELS = [p.value for p in Priority] + ["Other"]
+_DONE = STATUS_CODES[Status.COMPLETE]
+
+
+def _encode(values):
+    # values -> (int32 codes, labels in first-seen order)
+    labels = {}
+    codes = np.fromiter((labels.setdefault(v, len(labels)) for v in values), dtype=np.int32)
+    return codes, list(labels)
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+class TaskSnapshot:
+    """Every task as parallel arrays; read-only once built"""
+
+    GROUPS = ("project", "assignee", "category", "priority", "status")
+
+    def __init__(self, projects):
+        tasks = [(i, t) for i, p in enumerate(projects) for t in p.tasks]
+        n = len(tasks)
+        self.size = n
+        self.project = np.fromiter((i for i, _ in tasks), dtype=np.int32, count=n)
+        self.project_labels = [p.title for p in projects]
+        self.project_ids = [p.id for p in projects]
+        self.status = np.fromiter(
+            (STATUS_CODES.get(t.status, len(STATUS_CODES)) for _, t in tasks), dtype=np.int8, count=n
+        )
+        self.status_labels = STATUS_LABELS
+        self.priority = np.fromiter(
+            (t.priority.rank if isinstance(t.priority, Priority) else len(Priority) for _, t in tasks),
+            dtype=np.int8, count=n,
+        )
+        self.priority_labels = PRIORITY_LABELS
+        self.assignee, self.assignee_labels = _encode(normalize_user(t.assignee) for _, t in tasks)
+        self.category, self.category_labels = _encode((t.category or "").strip() for _, t in tasks)
+        self.deadline = np.array([t.deadline for _, t in tasks], dtype="datetime64[D]")
+        self.created = np.array([_timestamp(t.created) for _, t in tasks], dtype="datetime64[us]")
+        self.done = self.status == _DONE
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["projects"])
+
+    def _group(self, by):
+        if by not in self.GROUPS:
+            raise ValueError(f"Unknown group {by!r}, expected one of {self.GROUPS}")
+        return getattr(self, by), getattr(self, f"{by}_labels")
+
+    def _open_overdue(self, today):
+        today = np.datetime64(today or date.today(), "D")
+        open_ = ~self.done & ~np.isnat(self.deadline)
+        return open_, open_ & (self.deadline < today)
+
+    # ---- Rollups ----
+    def completion_by(self, by):
+        """DataFrame of total / done / completion per `by` group (see GROUPS)"""
+        codes, labels = self._group(by)
+        size = len(labels)
+        total = np.bincount(codes, minlength=size)
+        done = np.bincount(codes[self.done], minlength=size)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            completion = np.where(total > 0, done / total, 0.0)
+        return pd.DataFrame(
+            {"total": total, "done": done, "completion": completion},
+            index=pd.Index(labels, name=by),
+        )
+
+    def overdue_by(self, by, today=None):
+        """DataFrame of open (unfinished, with a deadline) / overdue / ratio per group"""
+        codes, labels = self._group(by)
+        size = len(labels)
+        open_, overdue = self._open_overdue(today)
+        n_open = np.bincount(codes[open_], minlength=size)
+        n_overdue = np.bincount(codes[overdue], minlength=size)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(n_open > 0, n_overdue / n_open, 0.0)
+        return pd.DataFrame(
+            {"open": n_open, "overdue": n_overdue, "ratio": ratio},
+            index=pd.Index(labels, name=by),
+        )
+
+    def completion(self):
+        return float(self.done.mean()) if self.size else 0.0
+
+    def overdue_ratio(self, today=None):
+        """Overdue share of unfinished tasks that have a deadline"""
+        open_, overdue = self._open_overdue(today)
+        n_open = int(open_.sum())
+        return int(overdue.sum()) / n_open if n_open else 0.0
+
+    def throughput(self, freq="W"):
+        """Tasks created per period and how many of those are complete"""
+        known = ~np.isnat(self.created)
+        frame = pd.DataFrame(
+            {"created": np.ones(int(known.sum()), dtype=np.int64), "done": self.done[known].astype(np.int64)},
+            index=pd.DatetimeIndex(self.created[known]),
+        )
+        return frame.resample(freq).sum()
@@ -0,0 +1,219 @@
+# auth.py
+# User accounts: registration and login.
+#
+# Accounts live in users.json plus an append-only users.journal.jsonl; each
+# journal line is a full user record that replaces any earlier one with the
+# same email. A process-wide UserDirectory keeps an email -> user index in
+# memory and only reads journal lines appended since it last looked, so
+# login cost doesn't grow with the number of users. The journal is folded
+# back into users.json every `compact_every` records.
+#
+# Passwords are stored as salted PBKDF2 hashes ("password_hash"). Hashing
+# runs on the caller's thread, outside the directory lock; hashlib releases
+# the GIL while it works, so concurrent logins hash in parallel and a slow
+# verification doesn't hold up other sessions. Accounts that still
+# have a plaintext "password" are upgraded on their next successful login.
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+from pathlib import Path
+
+from utils import codec
+from utils.storage import atomic_write_json, file_lock, file_signature
+
+USER_DATA_FILE = str(Path(__file__).parent.parent / "users.json")
+
+HASH_ITERATIONS = 200_000
+SECRET_FIELDS = ("password", "password_hash")
+
+
+def normalize_email(email):
+    return str(email or "").strip().lower()
+
+
+def hash_password(password, salt=None, iterations=HASH_ITERATIONS):
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+
+def check_password(password, stored):
+    try:
+        scheme, iterations, salt, _ = stored.split("$")
+    except (AttributeError, ValueError):
+        return False
+    if scheme != "pbkdf2_sha256":
+        return False
+    return hmac.compare_digest(hash_password(password, bytes.fromhex(salt), int(iterations)), stored)
+
+
+def public(user):
+    """The user record without credentials, as kept in the session"""
+    return {k: v for k, v in user.items() if k not in SECRET_FIELDS}
+
+
+class UserDirectory:
+    def __init__(self, path=USER_DATA_FILE, journal_path=None, compact_every=1000):
+        self.path = path
+        self.journal_path = journal_path or os.path.splitext(path)[0] + ".journal.jsonl"
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._users = {}         # normalized email -> user record
+        self._snapshot_sig = None
+        self._offset = 0         # journal bytes already indexed
+        self._journal_lines = 0
+        # Recent successful logins: email -> (password_hash, keyed digest of
+        # the password). Repeat logins skip PBKDF2; the key never leaves the
+        # process, so the cache holds nothing reusable.
+        self._verified = {}
+        self._cache_key = secrets.token_bytes(32)
+
+    # ---- Index maintenance ----
+    def _refresh(self):
+        snapshot_sig = file_signature(self.path)
+        if snapshot_sig != self._snapshot_sig:
+            self._users, self._offset, self._journal_lines = {}, 0, 0
+            try:
+                with open(self.path, "rb") as f:
+                    for user in codec.load(f).get("users", []):
+                        self._users[normalize_email(user.get("email"))] = user
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+            self._snapshot_sig = snapshot_sig
+        try:
+            size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            size = 0
+        if size < self._offset:  # compacted by another process
+            self._snapshot_sig = None
+            return self._refresh()
+        if size > self._offset:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(size - self._offset)
+            end = chunk.rfind(b"\n") + 1  # whole lines only
+            for line in chunk[:end].splitlines():
+                try:
+                    user = codec.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._users[normalize_email(user.get("email"))] = user
+                self._journal_lines += 1
+            self._offset += end
+
+    def _append(self, user):
+        # Caller holds the file lock
+        with open(self.journal_path, "ab") as f:
+            f.write(codec.dumps(user) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._refresh()
+        if self._journal_lines >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        atomic_write_json(self.path, {"users": list(self._users.values())})
+        open(self.journal_path, "w").close()
+        self._snapshot_sig = None
+        self._refresh()
+
+    # ---- Reads ----
+    def users(self):
+        with self._lock:
+            self._refresh()
+            return list(self._users.values())
+
+    def get(self, email):
+        with self._lock:
+            self._refresh()
+            return self._users.get(normalize_email(email))
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._users)
+
+    # ---- Writes ----
+    def register(self, name, email, password):
+        """(ok, message)"""
+        if self.get(email) is not None:
+            return False, "Email already exists."
+        password_hash = hash_password(password)
+        with self._lock, file_lock(self.path):
+            self._refresh()
+            if normalize_email(email) in self._users:
+                return False, "Email already exists."
+            self._append({"name": name, "email": email, "password_hash": password_hash})
+        return True, "Registration successful!"
+
+    def save_all(self, users):
+        """Replace every account (legacy save_users)"""
+        with self._lock, file_lock(self.path):
+            atomic_write_json(self.path, {"users": users})
+            open(self.journal_path, "w").close()
+            self._snapshot_sig = None
+            self._verified.clear()
+            self._refresh()
+
+    def verify(self, email, password):
+        """The public user record, or None if the credentials are wrong"""
+        key = normalize_email(email)
+        with self._lock:
+            self._refresh()
+            user = self._users.get(key)
+            cached = self._verified.get(key)
+        if user is None:
+            return None
+        digest = hmac.new(self._cache_key, password.encode(), "sha256").digest()
+        if cached and cached[0] == user.get("password_hash") and hmac.compare_digest(cached[1], digest):
+            return public(user)
+        return self._check(key, user, password, digest)
+
+    def _check(self, key, user, password, digest):
+        if "password_hash" in user:
+            if not check_password(password, user["password_hash"]):
+                return None
+        elif not hmac.compare_digest(str(user.get("password", "")).encode(), password.encode()):
+            return None
+        else:
+            # Legacy plaintext account: store a hash instead from now on
+            user = {**public(user), "password_hash": hash_password(password)}
+            with self._lock, file_lock(self.path):
+                self._append(user)
+        with self._lock:
+            self._verified[key] = (user["password_hash"], digest)
+        return public(user)
+
+
+_directories = {}
+_directories_guard = threading.Lock()
+
+
+def get_directory(path=None):
+    """The process-wide UserDirectory for `path` (default: USER_DATA_FILE)"""
+    path = os.path.abspath(path or USER_DATA_FILE)
+    with _directories_guard:
+        if path not in _directories:
+            _directories[path] = UserDirectory(path)
+        return _directories[path]
+
+
+def init_user_file():
+    if not os.path.exists(USER_DATA_FILE):
+        atomic_write_json(USER_DATA_FILE, {"users": []})
+
+def load_users():
+    return get_directory().users()
+
+def save_users(users):
+    get_directory().save_all(users)
+
+def register_user(name, email, password):
+    return get_directory().register(name, email, password)
+
+def login_user(email, password):
+    user = get_directory().verify(email, password)
+    return (True, user) if user is not None else (False, None)
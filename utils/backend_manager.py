@@ -1,24 +1,42 @@
 # backend_project_manager.py
 import streamlit as st
-import json
+import os
 import uuid
 from datetime import datetime
 
+from utils.storage import make_backend, create_project_op, add_task_op, update_task_op
+from utils.store import ProjectStore, ConflictError
+from utils.analytics import TaskSnapshot
+from utils.history import StatusHistory
+from utils.models import Project, Task, Status, Priority, STATUSES
+
+# "journal" (projects.json + append-only journal, default), "json" (plain
+# projects.json rewrites), "sqlite" (projects.db) or "sharded" (one file per
+# project under projects/)
+STORAGE_BACKEND = os.getenv("SYNCHRONY_STORAGE", "journal")
+
+# Append-only log of task status transitions (see utils.history)
+HISTORY_FILE = os.getenv("SYNCHRONY_HISTORY", "status_history.jsonl")
+
+# One cached store per server process, shared by all sessions
+@st.cache_resource
+def get_store():
+    return ProjectStore(make_backend(STORAGE_BACKEND), StatusHistory(HISTORY_FILE))
+
+def get_backend():
+    return get_store().backend
+
 # Load or initialize data
+# Returns {"projects": [Project, ...]} (see utils.models). The data is shared
+# between sessions - don't mutate it, use the helpers below to make changes.
 def load_data():
-    try:
-        with open("projects.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"projects": []}
+    return get_store().data()
 
 def save_data(data):
-    with open("projects.json", "w") as f:
-        json.dump(data, f, indent=2)
+    get_store().save(data)
 
 # Add new project
 def create_project(title, description, team_lead, members):
-    data = load_data()
     project = {
         "id": str(uuid.uuid4()),
         "title": title,
@@ -27,44 +45,132 @@ def create_project(title, description, team_lead, members):
         "members": members,
         "tasks": []
     }
-    data["projects"].append(project)
-    save_data(data)
+    get_store().apply([create_project_op(project)])
+    return project["id"]
 
 # Add task to project
 def add_task(project_id, title, assignee, status, deadline, priority, category, parent_id=None):
-    data = load_data()
-    for project in data["projects"]:
-        if project["id"] == project_id:
-            task = {
-                "id": str(uuid.uuid4()),
-                "title": title,
-                "assignee": assignee,
-                "status": status,
-                "deadline": deadline,
-                "priority": priority,
-                "category": category,
-                "parent_id": parent_id,
-                "created": str(datetime.now())
-            }
-            project["tasks"].append(task)
-            break
-    save_data(data)
+    task = {
+        "id": str(uuid.uuid4()),
+        "title": title,
+        "assignee": assignee,
+        "status": Status.canonical(status),
+        "deadline": deadline,
+        "priority": Priority.canonical(priority),
+        "category": category,
+        "parent_id": parent_id,
+        "created": str(datetime.now())
+    }
+    get_store().apply([add_task_op(project_id, task)])
+    return task["id"]
 
 # Update task status
-def update_task_status(project_id, task_id, status):
-    data = load_data()
-    for project in data["projects"]:
-        if project["id"] == project_id:
-            for task in project["tasks"]:
-                if task["id"] == task_id:
-                    task["status"] = status
-                    break
-    save_data(data)
+# Pass the task's "version" as expected_version to get a ConflictError
+# instead of overwriting a change someone else made in the meantime.
+def update_task_status(project_id, task_id, status, expected_version=None):
+    get_store().apply([update_task_op(project_id, task_id, _canonical({"status": status}), expected_version)])
+
+# Group several changes into one write, e.g.
+#     with transaction():
+#         pid = create_project(...)
+#         add_task(pid, ...)
+def transaction():
+    return get_store().transaction()
+
+# Apply many task changes at once: updates = [(project_id, task_id, {"status": ...}), ...]
+def apply_updates(updates):
+    get_store().apply([update_task_op(pid, tid, _canonical(fields)) for pid, tid, fields in updates])
+
+# Stored spelling for enum-valued fields ("med" -> "Medium", Status.TODO -> "To Do")
+def _canonical(fields):
+    fields = dict(fields)
+    if "status" in fields:
+        fields["status"] = Status.canonical(fields["status"])
+    if "priority" in fields:
+        fields["priority"] = Priority.canonical(fields["priority"])
+    return fields
+
+# [{"id", "title"}, ...] for project pickers - cheap on sharded storage
+def list_projects():
+    return get_store().list_projects()
 
 # Get project by ID
 def get_project(project_id):
-    data = load_data()
-    for project in data["projects"]:
-        if project["id"] == project_id:
-            return project
-    return None
+    return get_store().project(project_id)
+
+# Maintained counters for dashboards: status counts, per-member done/total,
+# overdue (see store.ProjectStats)
+def get_project_stats(project_id):
+    return get_store().stats(project_id)
+
+# Get task by ID (None if it doesn't exist)
+def get_task(task_id):
+    return get_store().task(task_id)[1]
+
+# Get (project, task) by task ID
+def find_task(task_id):
+    return get_store().task(task_id)
+
+# All (project, task) pairs assigned to a user, matched case-insensitively
+def get_tasks_for_assignee(assignee):
+    return get_store().tasks_for(assignee)
+
+# A user's tasks across all projects with their subtasks grouped by parent,
+# read from the store's per-user index (see store.UserWork)
+def get_user_work(assignee, sort=("priority", "deadline")):
+    return get_store().work_for(assignee, sort)
+
+# Filtered, sorted, paginated task lookup served from the store's indexes
+# (or SQL on the sqlite backend). Returns [(project_id, task), ...].
+#     query_tasks(assignee="bob", status="In Progress", sort=("priority", "deadline"), limit=20)
+def query_tasks(project=None, assignee=None, status=None, priority=None, due_before=None,
+                text=None, sort=None, limit=None, offset=0):
+    return get_store().query(
+        project=project, assignee=assignee, status=status, priority=priority,
+        due_before=due_before, text=text, sort=sort, limit=limit, offset=offset,
+    )
+
+# Unfinished tasks by deadline from the store's sorted deadline index,
+# as [(project_id, task), ...] earliest first
+def get_overdue_tasks(today=None):
+    return get_store().deadlines(overdue=True, today=today)
+
+def get_tasks_due_within(days, today=None):
+    return get_store().deadlines(within=days, today=today)
+
+def get_next_due(k, today=None):
+    return get_store().deadlines(upcoming=k, today=today)
+
+# Columnar snapshot of all tasks for org-wide rollups (see utils.analytics),
+# rebuilt only when the data changes
+def get_analytics():
+    return get_store().derived("analytics", TaskSnapshot.from_data)
+
+# Remaining open tasks per day for a project, [(date, open), ...], from the
+# incrementally maintained history rollups
+def get_burndown(project_id):
+    stats = get_store().stats(project_id)
+    if stats is None:
+        return []
+    return get_store().history.refresh().burndown(project_id, stats.total - stats.done)
+
+# {member: {"completed", "lead_days", "cycle_days"}} from logged transitions
+def get_cycle_times():
+    return get_store().history.refresh().cycle_times()
+
+# Direct subtasks of a task; pass project_id to read just that project
+def get_subtasks(parent_id, project_id=None):
+    return get_store().children(parent_id, project_id)
+
+# Roll-up over a task's subtree (any depth): .done/.total leaf tasks,
+# .progress and an aggregate .status. Cached until a descendant changes.
+def get_task_rollup(task_id, project_id=None):
+    return get_store().rollup(task_id, project_id)
+
+# [(depth, task), ...] for a task and all its descendants
+def get_subtree(task_id):
+    return get_store().subtree(task_id)
+
+# Parent task of a task (None for top-level tasks)
+def get_parent_task(task_id):
+    return get_store().parent(task_id)
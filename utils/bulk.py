@@ -0,0 +1,299 @@
+# bulk.py
+# Streaming bulk import/export of tasks (CSV or JSONL).
+#
+# One row per task:
+#     project, project_title, team_lead, id, title, assignee, status,
+#     deadline, priority, category, parent, created
+# `project` is a project id or title; unknown projects are created (titled
+# project_title, else `project`). `parent` is the id of a task in the same
+# project - an existing one or one from an earlier row - or, failing that,
+# a unique task title. Assignees missing from the project are added as
+# members.
+#
+# Rows are read, validated and turned into ops one at a time and committed
+# every `chunk_size` rows, so each chunk is a single storage write. Export
+# walks one project at a time and writes rows as it goes.
+#
+#     python -m utils.bulk import tasks.csv
+#     python -m utils.bulk export - --format jsonl > tasks.jsonl
+import argparse
+import csv
+import os
+import sys
+import uuid
+from contextlib import nullcontext
+from datetime import datetime
+
+from utils import codec
+from utils.history import StatusHistory
+from utils.models import Priority, Status, parse_date
+from utils.storage import add_member_op, add_task_op, create_project_op, make_backend
+from utils.store import ProjectStore, normalize_user
+
+COLUMNS = ("project", "project_title", "team_lead", "id", "title", "assignee", "status",
+           "deadline", "priority", "category", "parent", "created")
+
+
+class RowError(ValueError):
+    pass
+
+
+class ImportReport:
+    __slots__ = ("imported", "projects_created", "members_added", "errors")
+
+    def __init__(self):
+        self.imported = 0
+        self.projects_created = 0
+        self.members_added = 0
+        self.errors = []  # [(row number, message)]
+
+    def __str__(self):
+        return (f"{self.imported} tasks imported, {self.projects_created} projects created, "
+                f"{self.members_added} members added, {len(self.errors)} rows rejected")
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+# ---- Reading / writing rows ----
+def read_rows(f, fmt="csv"):
+    """Yield rows from an open text file: dicts for CSV, undecoded lines for
+    JSONL (see decode_row), so one bad line doesn't end the stream.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+    elif fmt == "jsonl":
+        for line in f:
+            if line.strip():
+                yield line
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected csv or jsonl")
+
+
+def decode_row(row):
+    """The row as a dict; raises RowError for a bad JSONL line or a non-object"""
+    if isinstance(row, (str, bytes)):
+        try:
+            row = codec.loads(row)
+        except ValueError as e:
+            raise RowError(f"invalid JSON: {e}") from None
+    if not isinstance(row, dict):
+        raise RowError(f"expected an object, got {type(row).__name__}")
+    return row
+
+
+def write_rows(rows, f, fmt="csv"):
+    """Write row dicts to an open text file as they come; returns the count"""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            f.write(codec.dumps(row).decode())
+            f.write("\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown format '{fmt}', expected csv or jsonl")
+    return count
+
+
+# ---- Export ----
+def export_rows(backend):
+    """Yield one row per task, reading one stored project at a time.
+
+    Goes to the backend rather than the store so that only the project
+    being written is held in memory (on backends with partial reads).
+    """
+    for entry in backend.list_projects():
+        project = backend.load_project(entry["id"])
+        if project is None:
+            continue
+        for task in project.get("tasks", []):
+            yield {
+                "project": project["id"],
+                "project_title": project.get("title", ""),
+                "team_lead": project.get("team_lead", ""),
+                "id": task["id"],
+                "title": task.get("title", ""),
+                "assignee": task.get("assignee", ""),
+                "status": task.get("status", ""),
+                "deadline": task.get("deadline") or "",
+                "priority": task.get("priority", ""),
+                "category": task.get("category", ""),
+                "parent": task.get("parent_id") or "",
+                "created": task.get("created", ""),
+            }
+
+
+# ---- Import ----
+class _ProjectState:
+    # What the importer needs to know about a project to validate rows
+    __slots__ = ("id", "members", "task_ids", "titles")
+
+    def __init__(self, project_id, members=(), tasks=()):
+        self.id = project_id
+        self.members = {normalize_user(m) for m in members}
+        self.task_ids = set()
+        self.titles = {}  # lowercased title -> task id, None if ambiguous
+        for task in tasks:
+            self.add_task(task["id"], task["title"])
+
+    def add_task(self, task_id, title):
+        self.task_ids.add(task_id)
+        key = (title or "").strip().lower()
+        self.titles[key] = None if key in self.titles else task_id
+
+
+class Importer:
+    def __init__(self, store, chunk_size=500, create_projects=True):
+        self.store = store
+        self.chunk_size = chunk_size
+        self.create_projects = create_projects
+        self.report = ImportReport()
+        self._projects = {}  # row "project" value -> _ProjectState
+        self._index = None   # lowercased title / id -> project id, from list_projects()
+        self._task_ids = set()  # ids imported so far (not yet necessarily in the store)
+        self._chunk = []
+
+    def _project(self, row):
+        key = str(row.get("project") or "").strip()
+        if not key:
+            raise RowError("missing project")
+        state = self._projects.get(key)
+        if state is not None:
+            return state
+        if self._index is None:
+            self._index = {}
+            for entry in self.store.list_projects():
+                self._index.setdefault(entry["title"].strip().lower(), entry["id"])
+                self._index[entry["id"]] = entry["id"]
+        project_id = self._index.get(key) or self._index.get(key.lower())
+        if project_id is not None:
+            project = self.store.project(project_id)
+            state = _ProjectState(project_id, project.members, project.tasks)
+        elif self.create_projects:
+            title = str(row.get("project_title") or key).strip()
+            team_lead = str(row.get("team_lead") or "").strip()
+            state = _ProjectState(str(uuid.uuid4()), [team_lead] if team_lead else [])
+            # Queued straight away: later rows rely on it even if this one is rejected
+            self._chunk.append(create_project_op({
+                "id": state.id, "title": title, "description": "",
+                "team_lead": team_lead, "members": [team_lead] if team_lead else [], "tasks": [],
+            }))
+            self._index[title.lower()] = state.id
+            self.report.projects_created += 1
+        else:
+            raise RowError(f"unknown project '{key}'")
+        self._projects[key] = state
+        return state
+
+    def _task_ops(self, row):
+        row = decode_row(row)
+        title = str(row.get("title") or "").strip()
+        if not title:
+            raise RowError("missing title")
+        status = Status.parse(row.get("status") or Status.TODO)
+        if not isinstance(status, Status):
+            raise RowError(f"unknown status '{row.get('status')}'")
+        priority = Priority.parse(row.get("priority") or Priority.MEDIUM)
+        if not isinstance(priority, Priority):
+            raise RowError(f"unknown priority '{row.get('priority')}'")
+        deadline = row.get("deadline") or ""
+        if deadline and parse_date(deadline) is None:
+            raise RowError(f"bad deadline '{deadline}'")
+
+        state = self._project(row)
+        task_id = str(row.get("id") or "").strip() or str(uuid.uuid4())
+        # Task ids are unique across projects, not just within one
+        if task_id in self._task_ids or self.store.task(task_id)[1] is not None:
+            raise RowError(f"duplicate task id '{task_id}'")
+        ops = []
+        parent = str(row.get("parent") or "").strip()
+        parent_id = None
+        if parent:
+            parent_id = parent if parent in state.task_ids else state.titles.get(parent.lower())
+            if parent_id is None:
+                raise RowError(f"unknown or ambiguous parent '{parent}'")
+
+        assignee = str(row.get("assignee") or "").strip()
+        if assignee and normalize_user(assignee) not in state.members:
+            ops.append(add_member_op(state.id, assignee))
+            state.members.add(normalize_user(assignee))
+            self.report.members_added += 1
+        ops.append(add_task_op(state.id, {
+            "id": task_id,
+            "title": title,
+            "assignee": assignee,
+            "status": status.value,
+            "deadline": deadline and parse_date(deadline).isoformat(),
+            "priority": priority.value,
+            "category": str(row.get("category") or "").strip(),
+            "parent_id": parent_id,
+            "created": row.get("created") or str(datetime.now()),
+        }))
+        state.add_task(task_id, title)
+        self._task_ids.add(task_id)
+        return ops
+
+    def feed(self, rows):
+        for number, row in enumerate(rows, 1):
+            try:
+                self._chunk.extend(self._task_ops(row))
+            except RowError as e:
+                self.report.errors.append((number, str(e)))
+                continue
+            self.report.imported += 1
+            if len(self._chunk) >= self.chunk_size:
+                self.flush()
+        self.flush()
+        return self.report
+
+    def flush(self):
+        if self._chunk:
+            self.store.apply(self._chunk)  # one transaction, one write
+            self._chunk = []
+
+
+def import_rows(store, rows, chunk_size=500, create_projects=True):
+    """Validate and import task rows; returns an ImportReport"""
+    return Importer(store, chunk_size, create_projects).feed(rows)
+
+
+# ---- CLI ----
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.bulk", description="Bulk import/export of tasks")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path", help="file to read or write, - for stdin/stdout")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--backend", default=os.getenv("SYNCHRONY_STORAGE", "journal"))
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--no-create-projects", action="store_true")
+    args = parser.parse_args(argv)
+
+    store = ProjectStore(make_backend(args.backend),
+                         StatusHistory(os.getenv("SYNCHRONY_HISTORY", "status_history.jsonl")))
+    fmt = detect_format(args.path, args.format)
+    if args.command == "import":
+        f = nullcontext(sys.stdin) if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+        with f as f:
+            report = import_rows(store, read_rows(f, fmt), args.chunk_size, not args.no_create_projects)
+        for number, message in report.errors:
+            print(f"row {number}: {message}", file=sys.stderr)
+        print(report, file=sys.stderr)
+        return 1 if report.errors else 0
+    f = nullcontext(sys.stdout) if args.path == "-" else open(args.path, "w", newline="", encoding="utf-8")
+    with f as f:
+        count = write_rows(export_rows(store.backend), f, fmt)
+    print(f"{count} tasks exported", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+# codec.py
+# JSON encode/decode used by the storage backends.
+# Uses orjson when it is installed (much faster, compact output) and falls
+# back to the standard library with compact separators otherwise.
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# keep catching the latter.
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def load(f):
+    """Decode an open file (text or binary)"""
+    return loads(f.read())
@@ -0,0 +1,63 @@
+# deadlines.py
+# Open tasks kept sorted by due date.
+#
+# Entries live in one list ordered by (due date, key), so "overdue",
+# "due within N days" and "next K due" are a bisect plus a slice:
+# O(log n + k). A whole index is built with one sort (from_entries); add()
+# and discard() keep it sorted after that. Used by the project store (maintained on every write) and
+# by the assistant page for its own task list.
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+
+
+class DeadlineIndex:
+    __slots__ = ("_entries", "_due")
+
+    def __init__(self):
+        self._entries = []  # sorted [(due, key, value)]; keys are unique
+        self._due = {}      # key -> due, to find an entry again on removal
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Index of (key, due, value) triples, sorted once; a repeated key keeps its last entry"""
+        index = cls()
+        latest = {key: (due, key, value) for key, due, value in entries}
+        index._entries = sorted(latest.values(), key=lambda entry: entry[:2])
+        index._due = {key: entry[0] for key, entry in latest.items()}
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key, due, value):
+        """Index `value` under `key`, replacing any previous entry for it"""
+        self.discard(key)
+        insort(self._entries, (due, key, value))
+        self._due[key] = due
+
+    def discard(self, key):
+        due = self._due.pop(key, None)
+        if due is None:
+            return
+        i = bisect_left(self._entries, (due, key))
+        if i < len(self._entries) and self._entries[i][1] == key:
+            del self._entries[i]
+
+    def between(self, start=None, end=None):
+        """Values due on or after `start` and before `end` (either may be None), earliest first"""
+        lo = 0 if start is None else bisect_left(self._entries, (start,))
+        hi = len(self._entries) if end is None else bisect_left(self._entries, (end,))
+        return [entry[2] for entry in self._entries[lo:hi]]
+
+    def overdue(self, today=None):
+        return self.between(end=today or date.today())
+
+    def due_within(self, days, today=None):
+        """Due from today through `days` days from now"""
+        today = today or date.today()
+        return self.between(today, today + timedelta(days=days + 1))
+
+    def next_due(self, k, today=None):
+        """The `k` earliest values due today or later"""
+        lo = bisect_left(self._entries, (today or date.today(),))
+        return [entry[2] for entry in self._entries[lo:lo + k]]
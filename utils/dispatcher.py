@@ -0,0 +1,173 @@
+# dispatcher.py
+# One place where every assistant session's API calls queue up.
+#
+# A Dispatcher runs an asyncio event loop on its own thread. Callers (the
+# Streamlit script threads) hand it a blocking call and wait for the
+# result. The loop admits calls one at a time, in priority order
+# (interactive before background, then first come first served), once
+# both of these hold:
+#   - fewer than `max_in_flight` calls are running
+#   - the token bucket has a token: `rate` calls per second on average,
+#     with bursts of up to `burst`
+# The admitted call runs on a worker thread, so the HTTP client stays
+# synchronous.
+#
+# Calls submitted with the same key while one is still queued or running
+# share its result instead of going out again (request coalescing).
+# call() waits for the result; submit() returns a future at once, for work
+# nobody is waiting on yet (e.g. prefetching at BACKGROUND priority).
+# Streams can't be shared that way, so they only go through admission:
+# stream() holds a slot until the stream has been read.
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+INTERACTIVE, BACKGROUND = 0, 1
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._stamp = clock()
+
+    async def take(self):
+        """Wait until a token is available and use it"""
+        while True:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Dispatcher:
+    def __init__(self, rate=2.0, burst=4, max_in_flight=8):
+        self.max_in_flight = max_in_flight
+        self._bucket = TokenBucket(rate, burst)
+        self._executor = ThreadPoolExecutor(max_in_flight, thread_name_prefix="llm-call")
+        self._loop = asyncio.new_event_loop()
+        # Everything below is only touched on the loop thread
+        self._waiting = []  # heap of (priority, sequence, admission future)
+        self._sequence = itertools.count()
+        self._pending = {}  # key -> task, for coalescing
+        self._in_flight = 0
+        self.submitted = self.coalesced = self.failed = 0
+        self.waited_seconds = 0.0
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-dispatcher", daemon=True)
+        self._thread.start()
+        self._run_on_loop(self._setup()).result()
+
+    async def _setup(self):
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._ready = asyncio.Event()  # set while calls are waiting
+        self._scheduler = self._loop.create_task(self._schedule())
+
+    def _run_on_loop(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    # ---- Admission (loop thread) ----
+    async def _schedule(self):
+        while True:
+            await self._ready.wait()
+            await self._slots.acquire()
+            await self._bucket.take()
+            # Pop only now, so a call that arrived meanwhile can still go first
+            _, _, admitted = heapq.heappop(self._waiting)
+            if not self._waiting:
+                self._ready.clear()
+            if admitted.cancelled():
+                self._slots.release()
+                continue
+            self._in_flight += 1
+            admitted.set_result(None)
+
+    async def _admit(self, priority):
+        admitted = self._loop.create_future()
+        heapq.heappush(self._waiting, (priority, next(self._sequence), admitted))
+        self._ready.set()
+        start = time.monotonic()
+        await admitted
+        self.waited_seconds += time.monotonic() - start
+
+    def _release(self):
+        self._in_flight -= 1
+        self._slots.release()
+
+    async def _run(self, fn, priority):
+        await self._admit(priority)
+        try:
+            return await self._loop.run_in_executor(self._executor, fn)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._release()
+
+    async def _call(self, fn, key, priority):
+        self.submitted += 1
+        task = self._pending.get(key) if key is not None else None
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._loop.create_task(self._run(fn, priority))
+            if key is not None:
+                self._pending[key] = task
+                task.add_done_callback(lambda _: self._pending.pop(key, None))
+        # Shielded: a caller that gives up doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    # ---- Callers (any thread) ----
+    def call(self, fn, key=None, priority=INTERACTIVE, timeout=None):
+        """Run fn() once admitted and return its result (or raise its exception).
+
+        Calls with the same (hashable) key that overlap share one fn() run.
+        """
+        return self.submit(fn, key, priority).result(timeout)
+
+    def submit(self, fn, key=None, priority=INTERACTIVE):
+        """Like call(), but return a concurrent.futures.Future straight away"""
+        return self._run_on_loop(self._call(fn, key, priority))
+
+    def stream(self, make_stream, priority=INTERACTIVE):
+        """Yield from make_stream() once admitted, holding a slot until it is exhausted or closed"""
+        self._run_on_loop(self._admit(priority)).result()
+        try:
+            yield from make_stream()
+        finally:
+            self._loop.call_soon_threadsafe(self._release)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "queued": len(self._waiting),
+            "in_flight": self._in_flight,
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
+
+
+_dispatcher = None
+_dispatcher_guard = threading.Lock()
+
+
+def get_dispatcher():
+    """The process-wide Dispatcher; limits come from SYNCHRONY_LLM_RATE / _BURST / _MAX_IN_FLIGHT"""
+    global _dispatcher
+    with _dispatcher_guard:
+        if _dispatcher is None:
+            _dispatcher = Dispatcher(
+                rate=float(os.getenv("SYNCHRONY_LLM_RATE", "2")),
+                burst=int(os.getenv("SYNCHRONY_LLM_BURST", "4")),
+                max_in_flight=int(os.getenv("SYNCHRONY_LLM_MAX_IN_FLIGHT", "8")),
+            )
+        return _dispatcher
@@ -0,0 +1,139 @@
+# history.py
+# Append-only log of task status transitions, with rollups kept current as
+# the log grows.
+#
+# Each line is a compact JSON array:
+#     [unix time, project id, task id, assignee, from status, to status]
+# with `from` = null when the task was created. The store appends one line
+# per transition after the change is committed to storage.
+#
+# StatusHistory.refresh() folds only the bytes appended since the last
+# call (by this or any other process) into HistoryRollups, so dashboards
+# read precomputed series instead of replaying the log.
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+
+from utils import codec
+from utils.models import Status
+from utils.storage import file_lock
+from utils.store import normalize_user
+
+DAY = 86400
+
+
+class HistoryRollups:
+    """Per-project daily burndown deltas and per-member lead/cycle times"""
+
+    def __init__(self):
+        self.open_deltas = defaultdict(lambda: defaultdict(int))  # project id -> day -> change in open tasks
+        self.members = {}  # normalized assignee -> [completed, n lead, lead total, n cycle, cycle total]
+        self._tasks = {}   # task id -> [created at, first started at]
+
+    def fold(self, record):
+        at, project_id, task_id, assignee, old, new = record
+        old, new = Status.parse(old), Status.parse(new)
+        was_open = old is not None and old != Status.COMPLETE
+        now_open = new != Status.COMPLETE
+        if was_open != now_open:
+            self.open_deltas[project_id][date.fromtimestamp(at)] += 1 if now_open else -1
+
+        state = self._tasks.setdefault(task_id, [None, None])
+        if old is None:
+            state[0] = at
+        if new == Status.IN_PROGRESS and state[1] is None:
+            state[1] = at
+        if new == Status.COMPLETE and was_open:
+            member = self.members.setdefault(normalize_user(assignee), [0, 0, 0, 0, 0])
+            member[0] += 1
+            if state[0] is not None:  # created before the log started: no lead time
+                member[1] += 1
+                member[2] += at - state[0]
+            if state[1] is not None:
+                member[3] += 1
+                member[4] += at - state[1]
+
+    def burndown(self, project_id, remaining, today=None):
+        """[(day, open tasks at end of day), ...] from the first logged day to today.
+
+        `remaining` is the project's current open count; earlier days are
+        derived by walking the daily deltas backwards.
+        """
+        deltas = self.open_deltas.get(project_id)
+        if not deltas:
+            return []
+        today = today or date.today()
+        day = min(deltas)
+        days = [day + timedelta(n) for n in range((today - day).days + 1)]
+        series = []
+        for d in reversed(days):
+            series.append((d, remaining))
+            remaining -= deltas.get(d, 0)
+        series.reverse()
+        return series
+
+    def cycle_times(self):
+        """{member: {"completed", "lead_days", "cycle_days"}} averaged over logged completions"""
+        return {
+            user: {
+                "completed": done,
+                "lead_days": lead / n_lead / DAY if n_lead else None,
+                "cycle_days": cycle / n_cycle / DAY if n_cycle else None,
+            }
+            for user, (done, n_lead, lead, n_cycle, cycle) in self.members.items()
+        }
+
+
+class StatusHistory:
+    def __init__(self, path="status_history.jsonl"):
+        self.path = path
+        self.rollups = HistoryRollups()
+        self._offset = 0  # bytes of the log folded into rollups
+        self._lock = threading.Lock()
+
+    def append(self, records):
+        if not records:
+            return
+        lines = b"".join(codec.dumps(list(r)) + b"\n" for r in records)
+        with file_lock(self.path):
+            with open(self.path, "ab") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def refresh(self):
+        """Fold new log lines into the rollups; returns the rollups"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                size = 0
+            if size < self._offset:  # log was replaced: start over
+                self.rollups, self._offset = HistoryRollups(), 0
+            if size > self._offset:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    chunk = f.read(size - self._offset)
+                # Only whole lines; a torn tail is picked up on a later call
+                end = chunk.rfind(b"\n") + 1
+                for line in chunk[:end].splitlines():
+                    try:
+                        self.rollups.fold(codec.loads(line))
+                    except (json.JSONDecodeError, ValueError, TypeError):
+                        continue
+                self._offset += end
+            return self.rollups
+
+    def records(self):
+        """Every logged transition, oldest first"""
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        yield codec.loads(line)
+                    except json.JSONDecodeError:
+                        break
+        except FileNotFoundError:
+            return
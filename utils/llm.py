@@ -0,0 +1,306 @@
+# llm.py
+# HTTP client for the Mistral chat-completions API.
+#
+# One pooled requests.Session per process, so connections are kept alive
+# and only the first call pays for TCP/TLS setup. Connect and read timeouts
+# are separate: an unreachable host fails in seconds, while a slow
+# completion still has time to finish. 429/5xx responses and connection
+# errors are retried a couple of times with jittered exponential backoff
+# (honouring Retry-After); read timeouts are not. Calls queued through
+# utils.dispatcher pass retries=0, so each admitted call is one request
+# against the rate limit.
+#
+# A circuit breaker counts consecutive failed calls. Once it opens, calls
+# fail at once with ApiUnavailable for `reset_after` seconds, so the
+# assistant goes straight to its built-in replies; after that a single
+# trial call decides whether to close it again.
+#
+# stream_chat() asks for a server-sent event stream and yields text deltas
+# as they arrive, for showing a reply while it is still being written.
+#
+# ResponseCache keeps recent completions (LRU + TTL) so that repeating a
+# prompt over unchanged task data doesn't cost another API call.
+#
+# MISTRAL_BASE_URL points the client elsewhere (e.g. a local stub server).
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MISTRAL_BASE_URL = os.getenv("MISTRAL_BASE_URL", "https://api.mistral.ai/v1")
+MISTRAL_MODEL = "mistral-small-latest"
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ApiUnavailable(RuntimeError):
+    """The API could not produce a completion; callers fall back to local replies"""
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold=5, reset_after=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False  # a half-open trial call is in flight
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_after:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """True if a call may go out now; in half-open state only one trial is let through"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures, self._opened_at, self._trial = 0, None, False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+
+class MistralClient:
+    def __init__(self, api_key, base_url=MISTRAL_BASE_URL, connect_timeout=3.05, read_timeout=20.0,
+                 retries=2, backoff=0.5, max_backoff=4.0, pool_size=10, breaker=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {api_key}",
+                                     "Content-Type": "application/json"})
+
+    @property
+    def available(self):
+        """False while the circuit is open (calls would fail straight away)"""
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def _delay(self, attempt, response=None):
+        retry_after = response is not None and response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        # Full jitter, so sessions that failed together don't retry together
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _post(self, path, payload, retries=None, **kwargs):
+        """POST with retries behind the breaker; returns a 200 response or raises ApiUnavailable"""
+        if not self.breaker.allow():
+            raise ApiUnavailable("circuit open")
+        url = f"{self.base_url}{path}"
+        retries = self.retries if retries is None else retries
+        healthy = False
+        try:
+            for attempt in range(retries + 1):
+                response = None
+                try:
+                    response = self.session.post(url, json=payload, timeout=self.timeout, **kwargs)
+                except requests.ReadTimeout as e:
+                    # The service is up but too slow; asking again would only double the wait
+                    raise ApiUnavailable(str(e)) from e
+                except requests.ConnectionError as e:  # includes connect timeouts
+                    error = e
+                except requests.RequestException as e:
+                    # Bad URL, redirect loop, truncated or undecodable body: not worth retrying
+                    raise ApiUnavailable(str(e)) from e
+                else:
+                    if response.status_code == 200:
+                        healthy = True
+                        return response
+                    error = f"HTTP {response.status_code}"
+                    response.close()  # hand the connection back to the pool
+                    if response.status_code not in RETRY_STATUSES:
+                        # Our request is at fault, not the service: don't trip the breaker
+                        healthy = True
+                        raise ApiUnavailable(error)
+                if attempt < retries:
+                    time.sleep(self._delay(attempt, response))
+            raise ApiUnavailable(str(error))
+        finally:
+            # Every call let through settles the breaker, so a half-open trial can't stay pending
+            if healthy:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def chat(self, messages, model=MISTRAL_MODEL, retries=None, **params):
+        """The assistant message content for a chat completion (retries: default self.retries)"""
+        response = self._post("/chat/completions", {"model": model, "messages": messages, **params}, retries)
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ApiUnavailable(f"unexpected response: {e}") from e
+
+    def stream_chat(self, messages, model=MISTRAL_MODEL, retries=None, **params):
+        """Yield the completion's text as it arrives (server-sent events).
+
+        Raises ApiUnavailable before the first chunk if the request fails,
+        or part-way through if the stream breaks off.
+        """
+        payload = {"model": model, "messages": messages, "stream": True, **params}
+        response = self._post("/chat/completions", payload, retries, stream=True)
+        with response:
+            try:
+                for line in response.iter_lines(chunk_size=None):  # hand on whatever has arrived
+                    # Events are "data: {json}" lines; blank lines and comments separate them
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        return
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+                raise requests.ConnectionError("stream closed before [DONE]")
+            except requests.RequestException as e:
+                self.breaker.record_failure()
+                raise ApiUnavailable(f"stream interrupted: {e}") from e
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise ApiUnavailable(f"unexpected stream event: {e}") from e
+
+
+class ResponseCache:
+    """Completion texts by request key, evicted least-recently-used beyond
+    `maxsize` and expired `ttl` seconds after they were stored.
+
+    Entries belong to a data version (see sync): when a newer version shows
+    up everything cached for older ones is dropped.
+    """
+
+    def __init__(self, maxsize=256, ttl=600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires, text, seconds the API call took)
+        self.version = None
+        self.hits = self.misses = self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def sync(self, version):
+        """Note the caller's data version; False if it is older than the cache's (don't use the cache)"""
+        if version is None:
+            return True
+        with self._lock:
+            if self.version is None or version > self.version:
+                self._entries.clear()
+                self.version = version
+            return version == self.version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[2]
+            return entry[1]
+
+    def put(self, key, text, seconds=0.0):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, text, seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        # Unlike get(), doesn't count as a lookup
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > self._clock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+def cache_key(prompt, context, model, params):
+    """Cache key for a prompt: normalized text, a digest of the task context, model and parameters"""
+    return (
+        " ".join(prompt.lower().split()),
+        hashlib.sha256(context.encode()).hexdigest(),
+        model,
+        tuple(sorted(params.items())),
+    )
+
+
+_client = None
+_client_guard = threading.Lock()
+_cache = ResponseCache(
+    maxsize=int(os.getenv("SYNCHRONY_LLM_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SYNCHRONY_LLM_CACHE_TTL", "600")),
+)
+
+
+def get_response_cache():
+    """The process-wide ResponseCache, shared by every session"""
+    return _cache
+
+
+def get_client():
+    """The process-wide MistralClient, or None when MISTRAL_API_KEY is not set"""
+    global _client
+    api_key = os.getenv("MISTRAL_API_KEY")
+    if not api_key:
+        return None
+    with _client_guard:
+        if _client is None or _client.api_key != api_key:
+            _client = MistralClient(api_key)
+        return _client
@@ -0,0 +1,221 @@
+# models.py
+# Typed project/task records held by the in-memory store.
+#
+# Status and priority are enum singletons, deadlines are parsed to `date`
+# once at load time, and repeated strings (assignees, categories) are
+# interned. Records still answer record["key"] / record.get("key") with the
+# stored JSON representation, so code written against the old dicts keeps
+# working.
+import sys
+from dataclasses import dataclass, field
+from datetime import date
+from enum import Enum
+from typing import List, Optional, Union
+
+# __slots__ dataclasses need Python 3.10+
+_record = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+
+class _Choice(str, Enum):
+    # Format/print as the plain value ("In Progress", not "Status.IN_PROGRESS")
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+    @classmethod
+    def parse(cls, value):
+        """Enum member for `value` (case-insensitive, aliases allowed); unknown values pass through"""
+        if isinstance(value, cls) or value is None:
+            return value
+        return cls._lookup().get(str(value).strip().lower(), value)
+
+    @classmethod
+    def canonical(cls, value):
+        """Plain stored string for `value` ("med" -> "Medium")"""
+        value = cls.parse(value)
+        return value.value if isinstance(value, cls) else value
+
+    @classmethod
+    def spellings(cls, value):
+        """Every lowercased stored string that parses to `value` ("Medium" -> {"medium", "med"})"""
+        value = cls.parse(value)
+        if not isinstance(value, cls):
+            return {str(value).strip().lower()}
+        return {key for key, member in cls._lookup().items() if member is value}
+
+    @classmethod
+    def _lookup(cls):
+        return {}
+
+
+class Status(_Choice):
+    TODO = "To Do"
+    IN_PROGRESS = "In Progress"
+    COMPLETE = "Complete"
+
+    @classmethod
+    def _lookup(cls):
+        return _STATUS_LOOKUP
+
+
+class Priority(_Choice):
+    HIGH = "High"
+    MEDIUM = "Medium"
+    LOW = "Low"
+
+    @property
+    def rank(self):
+        # Sort key: High first
+        return _PRIORITY_RANK[self]
+
+    @classmethod
+    def _lookup(cls):
+        return _PRIORITY_LOOKUP
+
+
+STATUSES = list(Status)
+_STATUS_LOOKUP = {s.value.lower(): s for s in Status}
+_STATUS_LOOKUP.update({"todo": Status.TODO, "in_progress": Status.IN_PROGRESS,
+                       "done": Status.COMPLETE, "completed": Status.COMPLETE})
+_PRIORITY_LOOKUP = {p.value.lower(): p for p in Priority}
+_PRIORITY_LOOKUP.update({"med": Priority.MEDIUM})
+_PRIORITY_RANK = {Priority.HIGH: 0, Priority.MEDIUM: 1, Priority.LOW: 2}
+
+
+def priority_rank(priority):
+    return priority.rank if isinstance(priority, Priority) else len(_PRIORITY_RANK)
+
+
+def parse_date(value):
+    if isinstance(value, date) or not value:
+        return value or None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+TASK_KEYS = ("id", "title", "assignee", "status", "deadline", "priority",
+             "category", "parent_id", "created", "version")
+
+
+@_record
+class Task:
+    id: str
+    title: str = ""
+    assignee: str = ""
+    status: Union[Status, str] = Status.TODO
+    deadline: Optional[date] = None
+    priority: Union[Priority, str] = Priority.MEDIUM
+    category: str = ""
+    parent_id: Optional[str] = None
+    created: str = ""
+    version: int = 0
+    extra: dict = field(default_factory=dict)  # keys this model doesn't know about
+
+    @classmethod
+    def from_dict(cls, record):
+        task = cls(id=record["id"])
+        task.update(record)
+        return task
+
+    def update(self, fields):
+        for key, value in fields.items():
+            if key == "status":
+                value = Status.parse(value)
+            elif key == "priority":
+                value = Priority.parse(value)
+            elif key == "deadline":
+                value = parse_date(value)
+            elif key in ("assignee", "category"):
+                value = _intern(value)
+            elif key not in TASK_KEYS:
+                self.extra[key] = value
+                continue
+            setattr(self, key, value)
+
+    def _field(self, key):
+        value = getattr(self, key)
+        if isinstance(value, _Choice):
+            return value.value
+        if isinstance(value, date):
+            return value.isoformat()
+        return value
+
+    def to_dict(self):
+        record = {key: self._field(key) for key in TASK_KEYS}
+        record.update(self.extra)
+        return record
+
+    # Read access in the old dict style
+    def __getitem__(self, key):
+        if key in TASK_KEYS:
+            return self._field(key)
+        return self.extra[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+PROJECT_KEYS = ("id", "title", "description", "team_lead", "members", "tasks")
+
+
+@_record
+class Project:
+    id: str
+    title: str = ""
+    description: str = ""
+    team_lead: str = ""
+    members: List[str] = field(default_factory=list)
+    tasks: List[Task] = field(default_factory=list)
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, record):
+        extra = {k: v for k, v in record.items() if k not in PROJECT_KEYS}
+        return cls(
+            id=record["id"],
+            title=record.get("title", ""),
+            description=record.get("description", ""),
+            team_lead=_intern(record.get("team_lead", "")),
+            members=[_intern(m) for m in record.get("members", [])],
+            tasks=[Task.from_dict(t) for t in record.get("tasks", [])],
+            extra=extra,
+        )
+
+    def to_dict(self):
+        record = {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "team_lead": self.team_lead,
+            "members": list(self.members),
+            "tasks": [t.to_dict() for t in self.tasks],
+        }
+        record.update(self.extra)
+        return record
+
+    def __getitem__(self, key):
+        if key in PROJECT_KEYS:
+            return getattr(self, key)
+        return self.extra[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def to_document(data):
+    """{"projects": [...]} with models turned back into plain dicts"""
+    return {
+        **data,
+        "projects": [p.to_dict() if isinstance(p, Project) else p for p in data["projects"]],
+    }
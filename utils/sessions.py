@@ -0,0 +1,234 @@
+# sessions.py
+# Signed, expiring session tokens so a reload or new tab picks the login
+# back up without going through users.json.
+#
+# A token is base64url(payload) + "." + base64url(HMAC-SHA256(payload)),
+# where the payload holds a random session id, the expiry time and the
+# public user record. Validation is a signature check plus a lookup of the
+# session id in an in-memory table of live sessions; that table is backed
+# by an append-only sessions.jsonl (issued and revoked ids) so sessions
+# survive restarts and are shared between server processes. Expired ids
+# drop out of the table, and the file is rewritten with just the live
+# sessions once it holds more than twice as many lines. The signing key comes
+# from SYNCHRONY_SESSION_SECRET or a key file created next to the store.
+#
+# The Streamlit side keeps the token in the "session" query parameter:
+# restore_session() at the top of a page, start_session() after login and
+# end_session() on logout.
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+from utils import codec
+from utils.storage import file_lock
+
+SESSION_FILE = os.getenv("SYNCHRONY_SESSIONS", "sessions.jsonl")
+SESSION_TTL = 7 * 24 * 3600
+QUERY_PARAM = "session"
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionTokens:
+    def __init__(self, path=SESSION_FILE, secret=None, ttl=SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._secret = secret or self._load_secret()
+        self._lock = threading.Lock()
+        self._active = {}  # live session id -> expiry (unix time)
+        self._expiries = []  # heap of (expiry, session id) for dropping expired ids
+        self._offset = 0   # store bytes already read
+        self._lines = 0
+        self._identity = None  # (device, inode, first line) of the file those bytes came from
+
+    def _load_secret(self):
+        secret = os.getenv("SYNCHRONY_SESSION_SECRET")
+        if secret:
+            return secret.encode()
+        key_path = os.path.splitext(self.path)[0] + ".key"
+        with file_lock(key_path):
+            try:
+                with open(key_path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                key = secrets.token_bytes(32)
+                fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(key)
+                return key
+
+    def _sign(self, payload):
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    # ---- Store ----
+    def _refresh(self):
+        now = time.time()
+        try:
+            st = os.stat(self.path)
+            size = st.st_size
+        except FileNotFoundError:
+            st, size = None, 0
+        if self._identity and (st is None or (st.st_dev, st.st_ino) != self._identity[:2]):
+            self._reset()  # replaced (compacted) by another process: reread
+        if size > self._offset:
+            with open(self.path, "rb") as f:
+                # Compaction starts the file with a fresh header line, so a
+                # different first line means a different file, even if it
+                # reuses the inode and is longer than what we've read
+                first = f.readline()
+                if self._identity and first != self._identity[2]:
+                    self._reset()
+                f.seek(self._offset)
+                chunk = f.read(size - self._offset)
+            end = chunk.rfind(b"\n") + 1
+            if self._offset == 0 and end:
+                self._identity = (st.st_dev, st.st_ino, first)
+            for line in chunk[:end].splitlines():
+                try:
+                    record = codec.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "sid" not in record:
+                    continue  # header
+                if record.get("revoked"):
+                    self._active.pop(record["sid"], None)
+                elif record["exp"] > now:
+                    self._active[record["sid"]] = record["exp"]
+                    heapq.heappush(self._expiries, (record["exp"], record["sid"]))
+                self._lines += 1
+            self._offset += end
+        while self._expiries and self._expiries[0][0] <= now:
+            exp, sid = heapq.heappop(self._expiries)
+            if self._active.get(sid) == exp:
+                del self._active[sid]
+
+    def _reset(self):
+        self._active, self._expiries, self._offset, self._lines = {}, [], 0, 0
+        self._identity = None
+
+    def _append(self, record):
+        with file_lock(self.path):
+            with open(self.path, "ab") as f:
+                f.write(codec.dumps(record) + b"\n")
+            self._refresh()
+            # Expired ids have left _active too, so plain logins get trimmed as well
+            if self._lines > 1000 and self._lines > 2 * len(self._active):
+                self._compact()
+
+    def _compact(self):
+        # Keep only live sessions (_refresh has dropped the expired ones); caller holds the file lock
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(codec.dumps({"generation": secrets.token_hex(8)}) + b"\n")
+            f.writelines(codec.dumps({"sid": sid, "exp": exp}) + b"\n" for sid, exp in self._active.items())
+        os.replace(tmp, self.path)
+        self._reset()
+        self._refresh()
+
+    # ---- Tokens ----
+    def issue(self, user):
+        """New token for a (public) user record"""
+        sid = secrets.token_urlsafe(16)
+        exp = int(time.time()) + self.ttl
+        payload = codec.dumps({"sid": sid, "exp": exp, "user": user})
+        with self._lock:
+            self._append({"sid": sid, "exp": exp})
+        return f"{_b64(payload)}.{_b64(self._sign(payload))}"
+
+    def _decode(self, token):
+        try:
+            payload_text, signature = str(token).split(".")
+            payload = _unb64(payload_text)
+            if not hmac.compare_digest(_unb64(signature), self._sign(payload)):
+                return None
+            claims = codec.loads(payload)
+        except (ValueError, TypeError):
+            return None
+        return claims if isinstance(claims, dict) else None
+
+    def validate(self, token):
+        """The token's user record if it is authentic, unexpired and not revoked, else None"""
+        claims = self._decode(token)
+        if claims is None or claims.get("exp", 0) <= time.time():
+            return None
+        with self._lock:
+            self._refresh()
+            if claims.get("sid") not in self._active:
+                return None
+        return claims.get("user")
+
+    def revoke(self, token):
+        claims = self._decode(token)
+        if claims is None:
+            return
+        with self._lock:
+            self._append({"sid": claims["sid"], "revoked": True})
+
+
+_tokens = None
+_tokens_guard = threading.Lock()
+
+
+def get_tokens():
+    """The process-wide SessionTokens"""
+    global _tokens
+    with _tokens_guard:
+        if _tokens is None:
+            _tokens = SessionTokens()
+        return _tokens
+
+
+# ---- Streamlit glue ----
+def restore_session():
+    """True if this browser session is logged in, restoring it from the URL token if needed"""
+    import streamlit as st
+
+    if st.session_state.get("authenticated"):
+        token = st.session_state.get("session_token")
+        # switch_page drops query parameters; put the token back for reloads
+        if token and st.query_params.get(QUERY_PARAM) != token:
+            st.query_params[QUERY_PARAM] = token
+        return True
+    token = st.query_params.get(QUERY_PARAM)
+    user = get_tokens().validate(token) if token else None
+    if user is None:
+        return False
+    st.session_state.authenticated = True
+    st.session_state.user = user
+    st.session_state.session_token = token
+    return True
+
+
+def start_session(user):
+    import streamlit as st
+
+    token = get_tokens().issue(user)
+    st.session_state.authenticated = True
+    st.session_state.user = user
+    st.session_state.session_token = token
+    st.query_params[QUERY_PARAM] = token
+
+
+def end_session():
+    import streamlit as st
+
+    token = st.session_state.get("session_token") or st.query_params.get(QUERY_PARAM)
+    if token:
+        get_tokens().revoke(token)
+    st.session_state.authenticated = False
+    st.session_state.user = None
+    st.session_state.session_token = None
+    if QUERY_PARAM in st.query_params:
+        del st.query_params[QUERY_PARAM]
@@ -0,0 +1,864 @@
+# storage.py
+# Storage backends for project data.
+#
+# Every backend hands out the same {"projects": [...]} document the pages
+# already use, and accepts small mutation records ("ops") so a single change
+# doesn't have to rewrite every project.
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from utils import codec
+from utils.models import Priority, Status
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PROJECT_FIELDS = ("id", "title", "description", "team_lead")
+TASK_FIELDS = ("id", "title", "assignee", "status", "deadline", "priority",
+               "category", "parent_id", "created")
+
+
+# ---- Mutation records ----
+def create_project_op(project):
+    return {"op": "create_project", "project": project}
+
+def add_task_op(project_id, task):
+    return {"op": "add_task", "project_id": project_id, "task": task}
+
+def add_member_op(project_id, name):
+    return {"op": "add_member", "project_id": project_id, "name": name}
+
+def update_task_op(project_id, task_id, fields, expected_version=None):
+    op = {"op": "update_task", "project_id": project_id, "task_id": task_id, "fields": dict(fields)}
+    if expected_version is not None:
+        op["expected_version"] = expected_version
+    return op
+
+
+# ---- Atomic files and locking ----
+def atomic_write_json(path, data):
+    """Write to a temp file and os.replace() it over `path`.
+
+    Readers never see a half-written file, so they don't need the lock.
+    """
+    os.replace(dump_tmp_json(path, data), path)
+
+def dump_tmp_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(codec.dumps(data))
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+
+# ---- Indexed snapshots ----
+# A snapshot is written one project at a time, and a <path>.idx sidecar
+# records each project's id, title and byte range, tagged with the
+# snapshot's file signature. Readers can then list projects, or decode a
+# single project, without parsing every task in the file. A stale or
+# missing index just means falling back to a full parse.
+
+class StaleIndex(Exception):
+    pass
+
+def index_path(path):
+    return path + ".idx"
+
+def dump_tmp_indexed(path, data):
+    """Like dump_tmp_json, but also returns the [id, title, offset, length] entries"""
+    rest = {k: v for k, v in data.items() if k != "projects"}
+    chunks = [b'{"projects":[']
+    offset = len(chunks[0])
+    entries = []
+    for i, project in enumerate(data["projects"]):
+        raw = codec.dumps(project)
+        if i:
+            chunks.append(b",")
+            offset += 1
+        entries.append([project["id"], project.get("title", ""), offset, len(raw)])
+        chunks.append(raw)
+        offset += len(raw)
+    chunks.append(b"]")
+    if rest:
+        chunks.append(b"," + codec.dumps(rest)[1:-1])
+    chunks.append(b"}")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(chunks))
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path, entries
+
+def write_index(path, entries, **extra):
+    # Call after the snapshot is in place: the index records its signature.
+    # `extra` keys are stored alongside (see read_index_document).
+    atomic_write_json(index_path(path), {"signature": file_signature(path)[0], "projects": entries, **extra})
+
+def write_indexed_snapshot(path, data, **extra):
+    tmp_path, entries = dump_tmp_indexed(path, data)
+    os.replace(tmp_path, path)
+    write_index(path, entries, **extra)
+
+def read_index_document(path):
+    """The whole index if it matches the current snapshot, else raise StaleIndex"""
+    try:
+        with open(index_path(path), "rb") as f:
+            index = codec.load(f)
+    except (FileNotFoundError, ValueError):
+        raise StaleIndex(path)
+    signature = file_signature(path)[0]
+    if signature is None or list(signature) != index["signature"]:
+        raise StaleIndex(path)
+    return index
+
+def read_index(path):
+    """Index entries if they match the current snapshot, else raise StaleIndex"""
+    return read_index_document(path)["projects"]
+
+def read_indexed_project(path, project_id):
+    """Decode one project from an indexed snapshot (None if it isn't there)"""
+    entries = read_index(path)
+    entry = next((e for e in entries if e[0] == project_id), None)
+    if entry is None:
+        return None
+    with open(path, "rb") as f:
+        # Same file the index was checked against? (it may have been replaced)
+        st = os.fstat(f.fileno())
+        if signature_of(st) != file_signature(path)[0]:
+            raise StaleIndex(path)
+        f.seek(entry[2])
+        return codec.loads(f.read(entry[3]))
+
+
+class FileLock:
+    """Advisory inter-process lock on a side file, re-entrant within a process.
+
+    Threads of one process are serialized by an RLock; the OS lock
+    (flock / msvcrt) is only taken by the outermost holder.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._shared = False
+        self._fd = None
+
+    def _os_lock(self, shared):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            # msvcrt has no shared mode; LK_NBLCK + retry instead of LK_LOCK's 10s cap
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    time.sleep(0.05)
+
+    def _os_unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def hold(self, shared=False):
+        with self._rlock:
+            if self._depth == 0:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+                self._os_lock(shared)
+                self._shared = shared
+            elif self._shared and not shared and fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)  # upgrade
+                self._shared = False
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._os_unlock()
+                    os.close(self._fd)
+                    self._fd = None
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+def file_lock(path, shared=False):
+    lock_path = os.path.abspath(path) + ".lock"
+    with _file_locks_guard:
+        lock = _file_locks.setdefault(lock_path, FileLock(lock_path))
+    return lock.hold(shared)
+
+
+def signature_of(st):
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def file_signature(*paths):
+    """(mtime, size, inode) per file; None for files that don't exist yet"""
+    sig = []
+    for path in paths:
+        try:
+            sig.append(signature_of(os.stat(path)))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def apply_op(data, op):
+    """Apply one mutation record to an in-memory {"projects": [...]} document"""
+    kind = op["op"]
+    if kind == "create_project":
+        data["projects"].append(op["project"])
+        return
+    for project in data["projects"]:
+        if project["id"] == op["project_id"]:
+            if kind == "add_task":
+                project["tasks"].append(op["task"])
+            elif kind == "update_task":
+                for task in project["tasks"]:
+                    if task["id"] == op["task_id"]:
+                        task.update(op["fields"])
+                        break
+            elif kind == "add_member":
+                if op["name"] not in project["members"]:
+                    project["members"].append(op["name"])
+            else:
+                raise ValueError(f"Unknown op: {kind}")
+            break
+
+
+class StorageBackend:
+    """Base class; subclasses must implement load() and save()"""
+
+    path = None
+    partial = False  # True if list_projects()/load_project() avoid a full load
+    sharded = False  # True if projects live in separate files (see shard_signatures)
+
+    def lock(self, shared=False):
+        # Writers hold this (exclusive) across read-check-write cycles
+        return file_lock(self.path, shared)
+
+    def load(self):
+        raise NotImplementedError
+
+    def save(self, data):
+        raise NotImplementedError
+
+    def signature(self):
+        # Changes whenever the stored data may have changed; None = unknown
+        return None
+
+    def list_projects(self):
+        return [{"id": p["id"], "title": p["title"]} for p in self.load()["projects"]]
+
+    def load_project(self, project_id):
+        return next((p for p in self.load()["projects"] if p["id"] == project_id), None)
+
+    def manifest_signature(self):
+        # Changes whenever list_projects() may have changed
+        return self.signature()
+
+    def shard_signature(self, project_id):
+        # Changes whenever load_project(project_id) may have changed
+        return self.signature()
+
+    def apply(self, ops):
+        # Fallback for backends without row-level writes
+        with self.lock():
+            data = self.load()
+            for op in ops:
+                apply_op(data, op)
+            self.save(data)
+
+
+class JsonBackend(StorageBackend):
+    """Whole-document projects.json storage (the original layout).
+
+    Snapshots are written with an offset index (see write_indexed_snapshot),
+    so project lists and single projects can be read lazily.
+    """
+
+    partial = True
+
+    def __init__(self, path="projects.json"):
+        self.path = path
+
+    def signature(self):
+        return file_signature(self.path)
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                return codec.load(f)
+        except FileNotFoundError:
+            return {"projects": []}
+
+    def save(self, data):
+        with self.lock():
+            write_indexed_snapshot(self.path, data)
+
+    def list_projects(self):
+        try:
+            return [{"id": e[0], "title": e[1]} for e in read_index(self.path)]
+        except StaleIndex:
+            return super().list_projects()
+
+    def load_project(self, project_id):
+        try:
+            return read_indexed_project(self.path, project_id)
+        except StaleIndex:
+            return super().load_project(project_id)
+
+
+class JournalBackend(JsonBackend):
+    """projects.json snapshot plus an append-only JSONL journal of ops.
+
+    Each mutation is one appended line; load() replays the journal on top of
+    the snapshot. Once the journal passes `compact_every` records it is folded
+    into a fresh snapshot on a background thread.
+
+    The journal's first line names its generation, and every snapshot
+    records how much of which generation it already contains ("journal":
+    {"generation", "offset"}, also kept in the index). Replay starts after
+    that point, so a crash between writing a snapshot and rewriting the
+    journal doesn't apply the folded ops twice. Lines that don't decode
+    (a torn append) are skipped, and the next append truncates them first.
+    """
+
+    HEADER = "journal"  # op name of the generation line
+
+    def __init__(self, path="projects.json", journal_path=None, compact_every=500):
+        super().__init__(path)
+        self.journal_path = journal_path or os.path.splitext(path)[0] + ".journal.jsonl"
+        self.compact_every = compact_every
+        self._compacting = False
+        self._compact_guard = threading.Lock()
+        self._pending = None  # journal length, counted lazily
+
+    # ---- Journal file ----
+    def _header(self):
+        return codec.dumps({"op": self.HEADER, "generation": uuid.uuid4().hex}) + b"\n"
+
+    def _read_journal(self):
+        """(generation, raw bytes); the generation is None for a journal without a header"""
+        try:
+            with open(self.journal_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None, b""
+        try:
+            header = codec.loads(raw[:raw.find(b"\n") + 1] or b"null")
+        except ValueError:
+            header = None
+        if isinstance(header, dict) and header.get("op") == self.HEADER:
+            return header["generation"], raw
+        return None, raw
+
+    def _journal_ops(self, generation, raw, covered=None):
+        """Ops from whole lines of `raw` that the snapshot (`covered` marker) doesn't contain yet"""
+        start = 0
+        if covered and covered.get("generation") == generation:
+            start = covered["offset"]
+        ops = []
+        for line in raw[start:raw.rfind(b"\n") + 1].splitlines():
+            try:
+                op = codec.loads(line)
+            except ValueError:
+                continue  # torn write from an interrupted append
+            if isinstance(op, dict) and op.get("op") != self.HEADER:
+                ops.append(op)
+        return ops
+
+    def _write_journal(self, tail):
+        # New generation holding `tail`; replaced atomically. Caller holds the lock.
+        tmp_path = f"{self.journal_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._header() + tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    @staticmethod
+    def _last_newline(f, size):
+        # Offset just past the last b"\n" in the file (0 if there is none)
+        pos = size
+        while pos > 0:
+            step = min(1 << 16, pos)
+            pos -= step
+            f.seek(pos)
+            i = f.read(step).rfind(b"\n")
+            if i >= 0:
+                return pos + i + 1
+        return 0
+
+    def _covered(self):
+        # The snapshot's journal marker, from its index (StaleIndex if outdated)
+        return read_index_document(self.path).get("journal")
+
+    # ---- Backend ----
+    def signature(self):
+        return file_signature(self.path, self.journal_path)
+
+    def load(self):
+        # Shared lock: snapshot and journal must come from the same generation
+        with self.lock(shared=True):
+            data = super().load()
+            generation, raw = self._read_journal()
+        ops = self._journal_ops(generation, raw, data.pop("journal", None))
+        for op in ops:
+            apply_op(data, op)
+        self._pending = len(ops)
+        return data
+
+    def save(self, data):
+        with self.lock():
+            generation, raw = self._read_journal()
+            covered = {"generation": generation, "offset": raw.rfind(b"\n") + 1}
+            data = {**data, "journal": covered}
+            write_indexed_snapshot(self.path, data, journal=covered)
+            self._write_journal(b"")
+            self._pending = 0
+
+    def list_projects(self):
+        try:
+            with self.lock(shared=True):
+                projects = [{"id": e[0], "title": e[1]} for e in read_index(self.path)]
+                covered = self._covered()
+                ops = self._journal_ops(*self._read_journal(), covered)
+        except StaleIndex:
+            self._start_compaction()  # writes a fresh index
+            return StorageBackend.list_projects(self)
+        for op in ops:
+            if op["op"] == "create_project":
+                projects.append({"id": op["project"]["id"], "title": op["project"]["title"]})
+        return projects
+
+    def load_project(self, project_id):
+        try:
+            with self.lock(shared=True):
+                project = read_indexed_project(self.path, project_id)
+                covered = self._covered()
+                ops = self._journal_ops(*self._read_journal(), covered)
+        except StaleIndex:
+            self._start_compaction()
+            return StorageBackend.load_project(self, project_id)
+        for op in ops:
+            if op["op"] == "create_project" and op["project"]["id"] == project_id:
+                project = op["project"]
+            elif project is not None and op.get("project_id") == project_id:
+                apply_op({"projects": [project]}, op)
+        return project
+
+    def apply(self, ops):
+        lines = b"".join(codec.dumps(op) + b"\n" for op in ops)
+        with self.lock():
+            with open(self.journal_path, "a+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                end = self._last_newline(f, size)
+                if end != size:
+                    f.truncate(end)  # torn tail of an interrupted append
+                if end == 0:
+                    lines = self._header() + lines
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._pending is None:
+                generation, raw = self._read_journal()
+                self._pending = len(self._journal_ops(generation, raw))
+            else:
+                self._pending += len(ops)
+            start = self._pending >= self.compact_every
+        if start:
+            self._start_compaction()
+
+    def _start_compaction(self):
+        with self._compact_guard:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, daemon=True).start()
+
+    def compact(self):
+        """Fold the journal into a new snapshot; appends keep going meanwhile"""
+        try:
+            with self.lock(shared=True):
+                snapshot_sig = file_signature(self.path)
+                data = JsonBackend.load(self)
+                generation, journal = self._read_journal()
+            offset = journal.rfind(b"\n") + 1  # only whole records
+            for op in self._journal_ops(generation, journal[:offset], data.pop("journal", None)):
+                apply_op(data, op)
+            covered = data["journal"] = {"generation": generation, "offset": offset}
+            tmp_path, entries = dump_tmp_indexed(self.path, data)
+            with self.lock():
+                if file_signature(self.path) != snapshot_sig:
+                    os.remove(tmp_path)  # another process compacted first
+                    return
+                # Keep whatever was appended while we were writing
+                try:
+                    with open(self.journal_path, "rb") as f:
+                        f.seek(offset)
+                        tail = f.read()
+                except FileNotFoundError:
+                    tail = b""
+                os.replace(tmp_path, self.path)
+                write_index(self.path, entries, journal=covered)
+                # A crash here is fine: the snapshot says which ops it already has
+                self._write_journal(tail)
+                self._pending = tail.count(b"\n")
+        finally:
+            self._compacting = False
+
+
+class SqliteBackend(StorageBackend):
+    """Row-per-record storage; single task updates touch a single row.
+
+    On first use an empty database is seeded from `import_path` (the legacy
+    projects.json) when that file exists.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS projects (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        title TEXT, description TEXT, team_lead TEXT, extra TEXT
+    );
+    CREATE TABLE IF NOT EXISTS members (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id TEXT NOT NULL REFERENCES projects(id),
+        name TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS tasks (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        project_id TEXT NOT NULL REFERENCES projects(id),
+        title TEXT, assignee TEXT, status TEXT, deadline TEXT, priority TEXT,
+        category TEXT, parent_id TEXT, created TEXT, extra TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_members_project ON members(project_id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project_id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks(assignee);
+    CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks(parent_id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_assignee_norm ON tasks(lower(trim(assignee)));
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(project_id, status);
+    CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(deadline);
+    """
+
+    # ORDER BY expressions for ProjectStore.query sort keys
+    SORT_SQL = {
+        "priority": "CASE lower(trim(priority)) WHEN 'high' THEN 0 WHEN 'medium' THEN 1"
+                    " WHEN 'med' THEN 1 WHEN 'low' THEN 2 ELSE 3 END",
+        "deadline": "(deadline IS NULL OR deadline = ''), deadline",
+        "created": "created",
+        "title": "lower(title)",
+        "status": "status",
+    }
+
+    def __init__(self, path="projects.db", import_path="projects.json"):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+            empty = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 0
+        if empty and import_path and os.path.exists(import_path):
+            self.save(JsonBackend(import_path).load())
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across
+        # Streamlit's script threads.
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _split(record, fields):
+        extra = {k: v for k, v in record.items() if k not in fields and k not in ("members", "tasks")}
+        return [record.get(k) for k in fields] + [json.dumps(extra) if extra else None]
+
+    @staticmethod
+    def _join(row, fields):
+        record = dict(zip(fields, row[:len(fields)]))
+        if row[len(fields)]:
+            record.update(json.loads(row[len(fields)]))
+        return record
+
+    def _insert_project(self, conn, project):
+        conn.execute(
+            "INSERT INTO projects (id, title, description, team_lead, extra) VALUES (?, ?, ?, ?, ?)",
+            self._split(project, PROJECT_FIELDS),
+        )
+        conn.executemany(
+            "INSERT INTO members (project_id, name) VALUES (?, ?)",
+            [(project["id"], m) for m in project.get("members", [])],
+        )
+        for task in project.get("tasks", []):
+            self._insert_task(conn, project["id"], task)
+
+    def _insert_task(self, conn, project_id, task):
+        conn.execute(
+            "INSERT INTO tasks (project_id, id, title, assignee, status, deadline, priority,"
+            " category, parent_id, created, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [project_id] + self._split(task, TASK_FIELDS),
+        )
+
+    def _update_task(self, conn, project_id, task_id, fields):
+        columns = {k: v for k, v in fields.items() if k in TASK_FIELDS and k != "id"}
+        extra = {k: v for k, v in fields.items() if k not in TASK_FIELDS}
+        if extra:
+            row = conn.execute(
+                "SELECT extra FROM tasks WHERE id = ? AND project_id = ?", (task_id, project_id)
+            ).fetchone()
+            if row is None:
+                return
+            merged = json.loads(row[0]) if row[0] else {}
+            merged.update(extra)
+            columns["extra"] = json.dumps(merged)
+        if columns:
+            assignments = ", ".join(f"{k} = ?" for k in columns)
+            conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ? AND project_id = ?",
+                list(columns.values()) + [task_id, project_id],
+            )
+
+    def signature(self):
+        return file_signature(self.path)
+
+    partial = True
+
+    def list_projects(self):
+        with self._connect() as conn:
+            return [{"id": pid, "title": title}
+                    for pid, title in conn.execute("SELECT id, title FROM projects ORDER BY seq")]
+
+    def load_project(self, project_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, title, description, team_lead, extra FROM projects WHERE id = ?", (project_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            project = self._join(row, PROJECT_FIELDS)
+            project["members"] = [name for (name,) in conn.execute(
+                "SELECT name FROM members WHERE project_id = ? ORDER BY seq", (project_id,))]
+            project["tasks"] = [self._join(r, TASK_FIELDS) for r in conn.execute(
+                "SELECT id, title, assignee, status, deadline, priority, category, parent_id,"
+                " created, extra FROM tasks WHERE project_id = ? ORDER BY seq", (project_id,))]
+        return project
+
+    def query_tasks(self, project, assignees, statuses, priorities, due_before, text,
+                    sort, limit, offset):
+        """SQL version of ProjectStore.query: [(project id, task dict), ...]"""
+        where, params = [], []
+        if project is not None:
+            where.append("project_id = ?")
+            params.append(project)
+        # Stored values may be legacy spellings ("Med", "done"); match every
+        # spelling that parses to a requested value, as the in-memory path does
+        statuses = statuses and {s for v in statuses for s in Status.spellings(v)}
+        priorities = priorities and {s for v in priorities for s in Priority.spellings(v)}
+        for column, values in (("assignee", assignees), ("status", statuses), ("priority", priorities)):
+            if values is not None:
+                where.append(f"lower(trim({column})) IN ({', '.join('?' * len(values))})")
+                params.extend(str(v) for v in values)
+        if due_before is not None:
+            where.append("deadline != '' AND deadline < ?")
+            params.append(due_before.isoformat())
+        if text:
+            where.append("instr(lower(title), ?) > 0")
+            params.append(text)
+        order = []
+        for key in sort:
+            direction = " DESC" if key.startswith("-") else ""
+            order.extend(part + direction for part in self.SORT_SQL[key.lstrip("-")].split(", "))
+        sql = (
+            "SELECT id, title, assignee, status, deadline, priority, category, parent_id,"
+            " created, extra, project_id FROM tasks"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + " ORDER BY " + ", ".join(order + ["seq"])
+            + " LIMIT ? OFFSET ?"
+        )
+        params += [-1 if limit is None else limit, offset]
+        with self._connect() as conn:
+            return [(row[-1], self._join(row, TASK_FIELDS)) for row in conn.execute(sql, params)]
+
+    def load(self):
+        with self._connect() as conn:
+            projects = []
+            by_id = {}
+            for row in conn.execute(
+                "SELECT id, title, description, team_lead, extra FROM projects ORDER BY seq"
+            ):
+                project = self._join(row, PROJECT_FIELDS)
+                project["members"] = []
+                project["tasks"] = []
+                projects.append(project)
+                by_id[project["id"]] = project
+            for project_id, name in conn.execute("SELECT project_id, name FROM members ORDER BY seq"):
+                by_id[project_id]["members"].append(name)
+            for row in conn.execute(
+                "SELECT id, title, assignee, status, deadline, priority, category, parent_id,"
+                " created, extra, project_id FROM tasks ORDER BY seq"
+            ):
+                by_id[row[-1]]["tasks"].append(self._join(row, TASK_FIELDS))
+        return {"projects": projects}
+
+    def save(self, data):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM members")
+            conn.execute("DELETE FROM projects")
+            for project in data["projects"]:
+                self._insert_project(conn, project)
+
+    def apply(self, ops):
+        # All ops share one SQLite transaction
+        with self._connect() as conn:
+            for op in ops:
+                kind = op["op"]
+                if kind == "create_project":
+                    self._insert_project(conn, op["project"])
+                elif kind == "add_task":
+                    exists = conn.execute(
+                        "SELECT 1 FROM projects WHERE id = ?", (op["project_id"],)
+                    ).fetchone()
+                    if exists:
+                        self._insert_task(conn, op["project_id"], op["task"])
+                elif kind == "update_task":
+                    self._update_task(conn, op["project_id"], op["task_id"], op["fields"])
+                elif kind == "add_member":
+                    conn.execute(
+                        "INSERT INTO members (project_id, name) SELECT ?, ?"
+                        " WHERE EXISTS (SELECT 1 FROM projects WHERE id = ?)"
+                        " AND NOT EXISTS (SELECT 1 FROM members WHERE project_id = ? AND name = ?)",
+                        (op["project_id"], op["name"], op["project_id"], op["project_id"], op["name"]),
+                    )
+                else:
+                    raise ValueError(f"Unknown op: {kind}")
+
+
+class ShardedJsonBackend(StorageBackend):
+    """One JSON file per project plus a small manifest of ids and titles.
+
+    Layout: <root>/manifest.json ({"projects": [{"id", "title"}, ...]}) and
+    <root>/<project id>.json. Writes only rewrite the projects they touch
+    (and the manifest when a project is created). A missing <root> is seeded
+    from the legacy projects.json.
+
+    Each file is replaced atomically, but a transaction spanning several
+    projects is not atomic as a whole.
+    """
+
+    partial = True
+    sharded = True
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root="projects", import_path="projects.json"):
+        self.root = root
+        self.path = os.path.join(root, self.MANIFEST)
+        if not os.path.exists(self.path):
+            os.makedirs(root, exist_ok=True)
+            legacy = import_path and os.path.exists(import_path)
+            self.save(JsonBackend(import_path).load() if legacy else {"projects": []})
+
+    def _shard_path(self, project_id):
+        return os.path.join(self.root, f"{project_id}.json")
+
+    def manifest_signature(self):
+        return file_signature(self.path)
+
+    def shard_signature(self, project_id):
+        return file_signature(self._shard_path(project_id))
+
+    def shard_signatures(self):
+        sigs = {}
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.name != self.MANIFEST:
+                    st = entry.stat()
+                    sigs[entry.name[:-5]] = ((st.st_mtime_ns, st.st_size, st.st_ino),)
+        return sigs
+
+    def signature(self):
+        return self.manifest_signature() + tuple(sorted(self.shard_signatures().items()))
+
+    def list_projects(self):
+        with open(self.path, "rb") as f:
+            return codec.load(f)["projects"]
+
+    def load_project(self, project_id):
+        try:
+            with open(self._shard_path(project_id), "rb") as f:
+                return codec.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        with self.lock(shared=True):
+            projects = [self.load_project(entry["id"]) for entry in self.list_projects()]
+        return {"projects": [p for p in projects if p is not None]}
+
+    def _write_manifest(self, projects):
+        manifest = [{"id": p["id"], "title": p["title"]} for p in projects]
+        atomic_write_json(self.path, {"projects": manifest})
+
+    def save(self, data):
+        with self.lock():
+            for project in data["projects"]:
+                atomic_write_json(self._shard_path(project["id"]), project)
+            self._write_manifest(data["projects"])
+            live = {p["id"] for p in data["projects"]}
+            for project_id in self.shard_signatures():
+                if project_id not in live:
+                    os.remove(self._shard_path(project_id))
+
+    def apply(self, ops):
+        with self.lock():
+            manifest = None
+            shards = {}
+            for op in ops:
+                if op["op"] == "create_project":
+                    if manifest is None:
+                        manifest = self.list_projects()
+                    manifest.append(op["project"])
+                    shards[op["project"]["id"]] = codec.loads(codec.dumps(op["project"]))
+                    continue
+                project_id = op["project_id"]
+                if project_id not in shards:
+                    shards[project_id] = self.load_project(project_id)
+                if shards[project_id] is not None:
+                    apply_op({"projects": [shards[project_id]]}, op)
+            # Shards before manifest, so listed projects always have a file
+            for project_id, project in shards.items():
+                if project is not None:
+                    atomic_write_json(self._shard_path(project_id), project)
+            if manifest is not None:
+                self._write_manifest(manifest)
+
+
+BACKENDS = {
+    "json": JsonBackend,
+    "journal": JournalBackend,
+    "sqlite": SqliteBackend,
+    "sharded": ShardedJsonBackend,
+}
+
+def make_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown storage backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
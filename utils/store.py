@@ -0,0 +1,732 @@
+# store.py
+# Process-wide, in-memory view of the project data.
+#
+# Projects and tasks are held as utils.models records.
+#
+# One ProjectStore is shared by every Streamlit session (see
+# backend_manager.get_store). Reads are served from memory and only go back
+# to the backend when its file signature changes; writes go to the backend
+# and are applied to the cached copy in place.
+#
+# With a partial-loading backend (indexed JSON snapshots, SQLite, sharded
+# files), list_projects() and project() read just the project list or the
+# one project asked for until something needs the whole dataset; plain
+# apply() calls only read the projects they touch. With a sharded backend,
+# reloads only re-read the projects that changed, and a read of one project
+# only checks the manifest and that project's file.
+import heapq
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+
+from utils.deadlines import DeadlineIndex
+from utils.models import Project, Task, Status, Priority, parse_date, priority_rank, to_document
+
+
+class ConflictError(Exception):
+    """A task changed since the caller read it (version mismatch)"""
+
+
+def normalize_user(name):
+    return str(name or "").strip().lower()
+
+
+def _as_set(value, parse=lambda v: v):
+    # None -> no filter; a single value or any iterable -> set
+    if value is None:
+        return None
+    if isinstance(value, str) or not hasattr(value, "__iter__"):
+        value = [value]
+    return {parse(v) for v in value}
+
+
+# Sort keys accepted by ProjectStore.query ("-key" sorts descending)
+SORT_KEYS = {
+    "priority": lambda t: priority_rank(t.priority),
+    "deadline": lambda t: (t.deadline is None, t.deadline or date.min),
+    "created": lambda t: t.created or "",
+    "title": lambda t: t.title.lower(),
+    "status": lambda t: str(t.status),
+}
+
+
+def _sort_rows(rows, sort, offset=0, limit=None):
+    """Sort [(project id, task), ...] by SORT_KEYS names and slice to offset/limit"""
+    sort = [sort] if isinstance(sort, str) else list(sort or [])
+    # Apply sort keys last-to-first; each sort is stable
+    end = None if limit is None else offset + limit
+    for key in reversed(sort):
+        desc = key.startswith("-")
+        keyfunc = SORT_KEYS[key.lstrip("-")]
+        if end is not None and len(sort) == 1 and not desc:
+            rows = heapq.nsmallest(end, rows, key=lambda r: keyfunc(r[1]))
+        else:
+            rows.sort(key=lambda r: keyfunc(r[1]), reverse=desc)
+    return rows[offset:end]
+
+
+class UserWork:
+    """One user's tasks across projects, as [(project id, task), ...] lists"""
+
+    __slots__ = ("tasks", "subtasks")
+
+    def __init__(self, tasks, subtasks):
+        self.tasks = tasks          # everything assigned to the user
+        self.subtasks = subtasks    # parent task id -> the user's subtasks of it
+
+    @property
+    def roots(self):
+        """Tasks without a parent"""
+        return [(pid, t) for pid, t in self.tasks if not t.parent_id]
+
+
+class Rollup:
+    """Leaf-task totals under a task (the task itself if it has no subtasks)"""
+
+    __slots__ = ("total", "done", "in_progress")
+
+    def __init__(self, total=0, done=0, in_progress=0):
+        self.total = total
+        self.done = done
+        self.in_progress = in_progress
+
+    def add(self, other):
+        self.total += other.total
+        self.done += other.done
+        self.in_progress += other.in_progress
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def status(self):
+        """Aggregate status: Complete when every leaf is, To Do when none has started"""
+        if self.total and self.done == self.total:
+            return Status.COMPLETE
+        if self.done or self.in_progress:
+            return Status.IN_PROGRESS
+        return Status.TODO
+
+
+class ProjectStats:
+    """Running totals for one project, adjusted as tasks are (un)indexed"""
+
+    __slots__ = ("status_counts", "members", "open_deadlines")
+
+    def __init__(self):
+        self.status_counts = Counter()
+        self.members = {}               # normalized assignee -> [total, done]
+        self.open_deadlines = Counter() # deadline -> unfinished tasks due that day
+
+    @classmethod
+    def of(cls, project):
+        stats = cls()
+        for task in project.tasks:
+            stats.add(task)
+        return stats
+
+    def add(self, task, sign=1):
+        done = task.status == Status.COMPLETE
+        self.status_counts[task.status] += sign
+        counts = self.members.setdefault(normalize_user(task.assignee), [0, 0])
+        counts[0] += sign
+        counts[1] += sign if done else 0
+        if task.deadline and not done:
+            self.open_deadlines[task.deadline] += sign
+
+    def remove(self, task):
+        self.add(task, -1)
+
+    @property
+    def total(self):
+        return sum(self.status_counts.values())
+
+    @property
+    def done(self):
+        return self.status_counts[Status.COMPLETE]
+
+    @property
+    def progress(self):
+        total = self.total
+        return self.done / total if total else 0.0
+
+    def member(self, name):
+        """(done, total) for a team member"""
+        total, done = self.members.get(normalize_user(name), (0, 0))
+        return done, total
+
+    def overdue(self, today=None):
+        today = today or date.today()
+        return sum(n for due, n in self.open_deadlines.items() if due < today)
+
+
+class _PartialProject:
+    """One project loaded on its own, before the full dataset (see ProjectStore._load_partial)"""
+
+    __slots__ = ("signature", "project", "stats", "tasks", "children", "rollups")
+
+    def __init__(self, signature, project):
+        self.signature = signature
+        self.project = project
+        self.stats = project and ProjectStats.of(project)
+        self.tasks = {}     # task id -> task
+        self.children = {}  # parent task id -> {task id: task}
+        self.rollups = {}   # task id -> Rollup
+        for task in project.tasks if project else ():
+            self.tasks[task.id] = task
+            if task.parent_id:
+                self.children.setdefault(task.parent_id, {})[task.id] = task
+
+
+def _compute_rollup(task_id, task_of, children, rollups):
+    # One bottom-up (post-order) pass over the part of the subtree missing
+    # from `rollups`; task_of(id) is None for unknown tasks
+    stack = [(task_id, False)]
+    expanding = set()
+    while stack:
+        tid, expanded = stack.pop()
+        if tid in rollups:
+            continue
+        task = task_of(tid)
+        if task is None:
+            continue
+        kids = children.get(tid)
+        if kids and not expanded:
+            if tid in expanding:
+                continue  # parent_id cycle in the data
+            expanding.add(tid)
+            stack.append((tid, True))
+            stack.extend((kid, False) for kid in kids)
+            continue
+        if kids:
+            rollup = Rollup()
+            for kid in kids:
+                if kid in rollups:
+                    rollup.add(rollups[kid])
+        else:
+            status = task.status
+            rollup = Rollup(1, int(status == Status.COMPLETE), int(status == Status.IN_PROGRESS))
+        rollups[tid] = rollup
+    return rollups.get(task_id)
+
+
+class ProjectStore:
+    def __init__(self, backend, history=None):
+        self.backend = backend
+        self.history = history  # utils.history.StatusHistory, optional
+        self._transitions = []  # (project id, task id, assignee, from, to) awaiting commit
+        self.version = 0  # bumped on every reload or write
+        self._lock = threading.RLock()
+        self._data = None
+        self._signature = None
+        self._pending = None  # ops buffered by an open transaction
+        self._shard_sigs = {}  # project id -> signature (sharded backends)
+        self._manifest_sig = None  # manifest signature as of _shard_sigs (sharded backends)
+        self._manifest = None  # (signature, [{"id", "title"}]) before a full load
+        self._partial = {}     # project id -> _PartialProject before a full load
+        self._derived = {}     # name -> (version, value), see derived()
+        # Indexes, kept in step with _data
+        self._projects = {}     # project id -> project
+        self._tasks = {}        # task id -> (project, task)
+        self._by_assignee = {}  # normalized assignee -> {task id: (project, task)}
+        self._by_status = {}    # status -> {task id: (project, task)}
+        self._children = {}     # parent task id -> {task id: task}
+        self._user_children = {}  # normalized assignee -> {parent task id: {task id: (project, task)}}
+        self._stats = {}        # project id -> ProjectStats
+        self._rollups = {}      # task id -> Rollup; a cached task's whole subtree is cached too
+        self._deadlines = DeadlineIndex()  # unfinished tasks with a deadline -> (project, task)
+
+    # ---- Index maintenance ----
+    def _reindex(self):
+        self._projects = {}
+        self._tasks = {}
+        self._by_assignee = {}
+        self._by_status = {}
+        self._children = {}
+        self._user_children = {}
+        self._stats = {}
+        self._rollups = {}
+        deadlines = []  # sorted once at the end rather than inserted one by one
+        for project in self._data["projects"]:
+            self._index_project(project, deadlines)
+        self._deadlines = DeadlineIndex.from_entries(deadlines)
+
+    def _index_project(self, project, deadlines=None):
+        self._projects[project.id] = project
+        self._stats[project.id] = ProjectStats()
+        for task in project.tasks:
+            self._index_task(project, task, deadlines)
+
+    def _unindex_project(self, project):
+        self._projects.pop(project.id, None)
+        for task in project.tasks:
+            self._tasks.pop(task.id, None)
+            self._unindex_task(project, task)
+        self._stats.pop(project.id, None)
+
+    def _index_task(self, project, task, deadlines=None):
+        # `deadlines`: collect deadline entries there instead of adding them (see _reindex)
+        user = normalize_user(task.assignee)
+        self._tasks[task.id] = (project, task)
+        self._by_assignee.setdefault(user, {})[task.id] = (project, task)
+        self._by_status.setdefault(task.status, {})[task.id] = (project, task)
+        if task.parent_id:
+            self._children.setdefault(task.parent_id, {})[task.id] = task
+            self._user_children.setdefault(user, {}).setdefault(task.parent_id, {})[task.id] = (project, task)
+        if task.deadline and task.status != Status.COMPLETE:
+            if deadlines is None:
+                self._deadlines.add(task.id, task.deadline, (project, task))
+            else:
+                deadlines.append((task.id, task.deadline, (project, task)))
+        self._drop_rollups(task)
+        self._stats[project.id].add(task)
+
+    def _unindex_task(self, project, task):
+        user = normalize_user(task.assignee)
+        self._by_assignee.get(user, {}).pop(task.id, None)
+        self._by_status.get(task.status, {}).pop(task.id, None)
+        if task.parent_id:
+            self._children.get(task.parent_id, {}).pop(task.id, None)
+            self._user_children.get(user, {}).get(task.parent_id, {}).pop(task.id, None)
+        self._deadlines.discard(task.id)
+        self._drop_rollups(task)
+        self._stats[project.id].remove(task)
+
+    def _drop_rollups(self, task):
+        # The task and every cached ancestor. Ancestors of an uncached task
+        # are uncached too, so the walk stops at the first miss.
+        self._rollups.pop(task.id, None)
+        parent_id = task.parent_id
+        while parent_id and self._rollups.pop(parent_id, None) is not None:
+            parent = self._tasks.get(parent_id)
+            parent_id = parent[1].parent_id if parent else None
+
+    def _rollup(self, task_id):
+        return _compute_rollup(
+            task_id, lambda tid: self._tasks.get(tid, (None, None))[1], self._children, self._rollups
+        )
+
+    def _apply(self, op):
+        # Same semantics as storage.apply_op, but via the indexes. Ops carry
+        # plain dicts; the cache gets its own model records built from them.
+        kind = op["op"]
+        if kind == "create_project":
+            project = Project.from_dict(op["project"])
+            self._data["projects"].append(project)
+            self._index_project(project)
+            for task in project.tasks:
+                self._transition(project, task, None)
+        elif kind == "add_task":
+            project = self._projects.get(op["project_id"])
+            if project is not None:
+                task = Task.from_dict(op["task"])
+                project.tasks.append(task)
+                self._index_task(project, task)
+                self._transition(project, task, None)
+        elif kind == "add_member":
+            project = self._projects.get(op["project_id"])
+            if project is not None and op["name"] not in project.members:
+                project.members.append(op["name"])
+        elif kind == "update_task":
+            project, task = self._tasks.get(op["task_id"], (None, None))
+            if task is not None and project.id == op["project_id"]:
+                version = task.version
+                expected = op.get("expected_version")
+                if expected is not None and expected != version:
+                    raise ConflictError(
+                        f"Task {task.id} is at version {version}, expected {expected}"
+                    )
+                # The new version travels with the op so replays agree
+                op["fields"]["version"] = version + 1
+                old_status = task.status
+                self._unindex_task(project, task)
+                task.update(op["fields"])
+                self._index_task(project, task)
+                if task.status != old_status:
+                    self._transition(project, task, old_status)
+        else:
+            raise ValueError(f"Unknown op: {kind}")
+
+    def _transition(self, project, task, old_status):
+        if self.history is not None:
+            self._transitions.append((project.id, task.id, task.assignee, old_status, task.status))
+
+    def _refresh(self, project_id=None):
+        if self._pending is not None:
+            return  # never reload underneath an open transaction
+        if project_id is not None and self._data is not None and self.backend.sharded:
+            # A read of one project only needs the manifest and that project's file checked
+            if self.backend.manifest_signature() == self._manifest_sig:
+                signature = self.backend.shard_signature(project_id)
+                if signature != self._shard_sigs.get(project_id):
+                    self._reload_shard(project_id, signature)
+                return
+        signature = self.backend.signature()
+        if self._data is None or signature is None or signature != self._signature:
+            self._reload()
+
+    def _reload(self, force=()):
+        signature = self.backend.signature()
+        if self.backend.sharded and self._data is not None:
+            self._reload_shards(force)
+        else:
+            if self.backend.sharded:
+                manifest_sig = self.backend.manifest_signature()
+                shard_sigs = self.backend.shard_signatures()
+            else:
+                manifest_sig, shard_sigs = None, {}
+            self._data = self._decode(self.backend.load())
+            self._manifest_sig = manifest_sig
+            self._shard_sigs = shard_sigs
+            self._reindex()
+            self._manifest = None
+            self._partial = {}
+        self._signature = signature
+        self.version += 1
+
+    def _reload_shards(self, force):
+        # Re-read only projects whose file changed (or that are in `force`)
+        manifest_sig = self.backend.manifest_signature()
+        shard_sigs = self.backend.shard_signatures()
+        projects = []
+        for entry in self.backend.list_projects():
+            pid = entry["id"]
+            project = self._projects.get(pid)
+            if project is None or pid in force or shard_sigs.get(pid) != self._shard_sigs.get(pid):
+                if project is not None:
+                    self._unindex_project(project)
+                record = self.backend.load_project(pid)
+                if record is None:
+                    continue
+                project = Project.from_dict(record)
+                self._index_project(project)
+            projects.append(project)
+        live = {p.id for p in projects}
+        for pid in [pid for pid in self._projects if pid not in live]:
+            self._unindex_project(self._projects[pid])
+        self._data = {"projects": projects}
+        self._manifest_sig = manifest_sig
+        self._shard_sigs = shard_sigs
+
+    def _reload_shard(self, project_id, signature):
+        # Same project list, so only this project's tasks can have changed
+        old = self._projects.get(project_id)
+        record = self.backend.load_project(project_id)
+        if old is None or record is None:
+            self._reload()
+            return
+        self._unindex_project(old)
+        project = Project.from_dict(record)
+        projects = self._data["projects"]
+        projects[next(i for i, p in enumerate(projects) if p is old)] = project
+        self._index_project(project)
+        self._shard_sigs[project_id] = signature
+        self.version += 1
+
+    @staticmethod
+    def _decode(document):
+        return {**document, "projects": [Project.from_dict(p) for p in document["projects"]]}
+
+    def _mark_synced(self):
+        self._signature = self.backend.signature()
+        if self.backend.sharded:
+            self._manifest_sig = self.backend.manifest_signature()
+            self._shard_sigs = self.backend.shard_signatures()
+
+    # ---- Reads ----
+    def data(self):
+        """The cached {"projects": [Project, ...]} document. Shared: treat as read-only."""
+        with self._lock:
+            self._refresh()
+            return self._data
+
+    def list_projects(self):
+        """[{"id", "title"}, ...] without loading tasks where the backend allows it"""
+        with self._lock:
+            if self._data is None and self.backend.partial:
+                signature = self.backend.manifest_signature()
+                if self._manifest is None or self._manifest[0] != signature:
+                    self._manifest = (signature, self.backend.list_projects())
+                return self._manifest[1]
+            self._refresh()
+            return [{"id": p.id, "title": p.title} for p in self._data["projects"]]
+
+    def _load_partial(self, project_id):
+        signature = self.backend.shard_signature(project_id)
+        cached = self._partial.get(project_id)
+        if cached is None or cached.signature != signature:
+            record = self.backend.load_project(project_id)
+            cached = _PartialProject(signature, record and Project.from_dict(record))
+            self._partial[project_id] = cached
+        return cached
+
+    def project(self, project_id):
+        with self._lock:
+            if self._data is None and self.backend.partial:
+                return self._load_partial(project_id).project
+            self._refresh(project_id)
+            return self._projects.get(project_id)
+
+    def stats(self, project_id):
+        """ProjectStats for a project (None if it doesn't exist)"""
+        with self._lock:
+            if self._data is None and self.backend.partial:
+                return self._load_partial(project_id).stats
+            self._refresh(project_id)
+            return self._stats.get(project_id)
+
+    def task(self, task_id):
+        """(project, task) for a task id, or (None, None)"""
+        with self._lock:
+            self._refresh()
+            return self._tasks.get(task_id, (None, None))
+
+    def tasks_for(self, assignee):
+        """[(project, task), ...] assigned to `assignee` (case/space-insensitive)"""
+        with self._lock:
+            self._refresh()
+            return list(self._by_assignee.get(normalize_user(assignee), {}).values())
+
+    def derived(self, name, build):
+        """build(data) cached under `name` until the data next changes (version bump)"""
+        with self._lock:
+            self._refresh()
+            cached = self._derived.get(name)
+            if cached is None or cached[0] != self.version:
+                cached = (self.version, build(self._data))
+                self._derived[name] = cached
+            return cached[1]
+
+    def deadlines(self, overdue=False, within=None, upcoming=None, today=None):
+        """Unfinished tasks by deadline, earliest first, as [(project id, task), ...].
+
+        Pass one of: overdue=True (due before today), within=N (due in the
+        next N days, today included) or upcoming=K (the K earliest not yet
+        overdue).
+        """
+        with self._lock:
+            self._refresh()
+            if overdue:
+                rows = self._deadlines.overdue(today)
+            elif within is not None:
+                rows = self._deadlines.due_within(within, today)
+            elif upcoming is not None:
+                rows = self._deadlines.next_due(upcoming, today)
+            else:
+                rows = self._deadlines.between()
+            return [(p.id, t) for p, t in rows]
+
+    def work_for(self, assignee, sort=("priority", "deadline")):
+        """UserWork for `assignee`, built from the per-user indexes.
+
+        Costs time proportional to the user's own tasks, not the dataset.
+        """
+        user = normalize_user(assignee)
+        with self._lock:
+            self._refresh()
+            tasks = [(p.id, t) for p, t in self._by_assignee.get(user, {}).values()]
+            subtasks = {
+                parent: [(p.id, t) for p, t in kids.values()]
+                for parent, kids in self._user_children.get(user, {}).items() if kids
+            }
+        return UserWork(
+            _sort_rows(tasks, sort),
+            {parent: _sort_rows(kids, sort) for parent, kids in subtasks.items()},
+        )
+
+    def query(self, project=None, assignee=None, status=None, priority=None,
+              due_before=None, text=None, sort=None, limit=None, offset=0):
+        """[(project id, task), ...] matching every given filter.
+
+        assignee/status/priority take a single value or a collection. Tasks
+        are gathered from the most selective index, filtered, sorted by
+        `sort` (a key from SORT_KEYS or a sequence of them, "-key" for
+        descending; unsorted results come in index order) and sliced to
+        offset/limit.
+        """
+        assignees = _as_set(assignee, normalize_user)
+        statuses = _as_set(status, Status.parse)
+        priorities = _as_set(priority, Priority.parse)
+        due_before = parse_date(due_before)
+        text = text.strip().lower() if text else None
+        sort = [sort] if isinstance(sort, str) else list(sort or [])
+
+        with self._lock:
+            if self._data is None and hasattr(self.backend, "query_tasks"):
+                # Not loaded yet: let the database do the work
+                rows = self.backend.query_tasks(
+                    project, assignees, statuses, priorities, due_before, text, sort, limit, offset
+                )
+                return [(pid, Task.from_dict(record)) for pid, record in rows]
+            if self._data is None and self.backend.partial and project is not None:
+                loaded = self._load_partial(project).project
+                candidates = [[(loaded, t) for t in loaded.tasks] if loaded else []]
+            else:
+                self._refresh(project)
+                candidates = []
+                if project is not None:
+                    p = self._projects.get(project)
+                    candidates.append([(p, t) for t in p.tasks] if p else [])
+                if assignees is not None:
+                    candidates.append([r for a in assignees for r in self._by_assignee.get(a, {}).values()])
+                if statuses is not None:
+                    candidates.append([r for st in statuses for r in self._by_status.get(st, {}).values()])
+                if not candidates:
+                    candidates.append(self._tasks.values())
+            rows = min(candidates, key=len)
+
+            def matches(p, t):
+                return (
+                    (project is None or p.id == project)
+                    and (assignees is None or normalize_user(t.assignee) in assignees)
+                    and (statuses is None or t.status in statuses)
+                    and (priorities is None or t.priority in priorities)
+                    and (due_before is None or (t.deadline is not None and t.deadline < due_before))
+                    and (text is None or text in t.title.lower())
+                )
+
+            rows = [(p.id, t) for p, t in rows if matches(p, t)]
+
+        return _sort_rows(rows, sort, offset, limit)
+
+    def children(self, parent_id, project_id=None):
+        """Direct subtasks of a task. Pass the task's project id to avoid a full
+        load on partial-loading backends."""
+        with self._lock:
+            if project_id is not None and self._data is None and self.backend.partial:
+                return list(self._load_partial(project_id).children.get(parent_id, {}).values())
+            self._refresh(project_id)
+            return list(self._children.get(parent_id, {}).values())
+
+    def rollup(self, task_id, project_id=None):
+        """Rollup (done/total leaves, progress, aggregate status) for a task's subtree.
+
+        Cached until the task or one of its descendants changes. As with
+        children(), passing the project id avoids a full load.
+        """
+        with self._lock:
+            if project_id is not None and self._data is None and self.backend.partial:
+                partial = self._load_partial(project_id)
+                return _compute_rollup(task_id, partial.tasks.get, partial.children, partial.rollups)
+            self._refresh(project_id)
+            return self._rollup(task_id)
+
+    def subtree(self, task_id):
+        """[(depth, task), ...] for a task and all its descendants, depth-first"""
+        with self._lock:
+            self._refresh()
+            entry = self._tasks.get(task_id)
+            if entry is None:
+                return []
+            rows, seen = [], set()
+            stack = [(0, entry[1])]
+            while stack:
+                depth, task = stack.pop()
+                if task.id in seen:
+                    continue
+                seen.add(task.id)
+                rows.append((depth, task))
+                stack.extend((depth + 1, kid) for kid in reversed(list(self._children.get(task.id, {}).values())))
+            return rows
+
+    def parent(self, task_id):
+        """The parent task of a task, or None"""
+        with self._lock:
+            self._refresh()
+            task = self._tasks.get(task_id, (None, None))[1]
+            return task and self._tasks.get(task.parent_id, (None, None))[1]
+
+    # ---- Writes ----
+    def save(self, data):
+        with self._lock:
+            document = to_document(data)
+            self.backend.save(document)
+            self._data = self._decode(document)
+            self._mark_synced()
+            self._reindex()
+            self.version += 1
+
+    def apply(self, ops):
+        with self._lock:
+            if self._pending is None and self._data is None and self.backend.partial:
+                self._apply_partial(ops)
+                return
+            with self.transaction():
+                for op in ops:
+                    self._apply(op)
+                self._pending.extend(ops)
+
+    def _apply_partial(self, ops):
+        # Nothing loaded yet: check the ops against just the projects they
+        # touch and hand them to the backend, instead of loading everything
+        touched = {op.get("project_id") or op["project"]["id"] for op in ops}
+        with self.backend.lock():
+            scratch = ProjectStore(self.backend, self.history)
+            projects = (self.backend.load_project(pid) for pid in touched)
+            scratch._data = {"projects": [Project.from_dict(p) for p in projects if p is not None]}
+            scratch._reindex()
+            for op in ops:
+                scratch._apply(op)  # ConflictError before anything is written
+            self.backend.apply(ops)
+        for pid in touched:
+            self._partial.pop(pid, None)
+        if any(op["op"] == "create_project" for op in ops):
+            self._manifest = None
+        self.version += 1
+        self._log_transitions(scratch._transitions)
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into a single backend commit.
+
+        Ops are applied to the cached data as they come in, and handed to the
+        backend in one apply() call when the outermost block exits. If the
+        block raises (including ConflictError), nothing is written and the
+        cache is reloaded.
+        """
+        with self._lock:
+            self._refresh()
+            outer = self._pending is None
+            if outer:
+                self._pending = []
+                self._transitions = []
+            try:
+                yield self
+                if outer and self._pending:
+                    self._commit()
+            except BaseException:
+                if outer:
+                    self._data = None  # drop uncommitted changes
+                raise
+            finally:
+                if outer:
+                    self._pending = None
+
+    def _commit(self):
+        with self.backend.lock():
+            if self.backend.signature() != self._signature:
+                # Another process wrote since we last read: replay our ops on
+                # top of its data. Plain updates merge; stale expected
+                # versions raise ConflictError.
+                touched = {op.get("project_id") or op["project"]["id"] for op in self._pending}
+                self._reload(force=touched)
+                self._transitions = []
+                for op in self._pending:
+                    self._apply(op)
+            self.backend.apply(self._pending)
+            self._mark_synced()
+        self.version += 1
+        self._log_transitions(self._transitions)
+        self._transitions = []
+
+    def _log_transitions(self, transitions):
+        if transitions:
+            # Logged only once the change itself is stored
+            now = int(time.time())
+            self.history.append([
+                (now, pid, tid, assignee, old and str(old), str(new))
+                for pid, tid, assignee, old, new in transitions
+            ])